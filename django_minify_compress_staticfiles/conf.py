@@ -11,12 +11,21 @@ DEFAULT_SETTINGS = {
     "MINIFY_FILES": True,
     "BROTLI_COMPRESSION": True,
     "GZIP_COMPRESSION": True,
+    "ZSTD_COMPRESSION": False,
     "MIN_FILE_SIZE": 200,
     "MAX_FILE_SIZE": 10485760,
     "COMPRESSION_LEVEL_GZIP": 6,
+    "USE_ZOPFLI": False,
+    "USE_ISAL": False,
     "COMPRESSION_LEVEL_BROTLI": 4,
+    "BROTLI_LEVEL_DYNAMIC": False,
+    "BROTLI_MODE": "auto",
+    "COMPRESSION_LEVEL_ZSTD": 15,
     "PRESERVE_COMMENTS": True,
     "MAX_FILES_PER_RUN": 1000,
+    "WORKERS": 1,
+    "IO_WORKERS": 16,
+    "CACHE_DIR": None,
     "SUPPORTED_EXTENSIONS": {
         "css": True,
         "js": True,
@@ -34,6 +43,7 @@ DEFAULT_SETTINGS = {
         "*-min.*",
         "*.gz",
         "*.br",
+        "*.zst",
         "*.zip",
     ],
 }
@@ -1,23 +1,479 @@
-import gzip
-import io
-import json
+import hashlib
 import logging
+import multiprocessing
 import os
-from pathlib import Path
+import tempfile
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
 
-import brotli
-import rcssmin
-import rjsmin
 from django.contrib.staticfiles.storage import ManifestFilesMixin, StaticFilesStorage
 from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from django.utils.deconstruct import deconstructible
 
 from .conf import DEFAULT_SETTINGS, get_setting
-from .utils import FileManager, is_safe_path
+from .utils import FileManager, is_safe_path, join_path, split_path
+
+# Minification and compression libraries are imported on first use by
+# _load_libraries(): this module is imported by every process serving the
+# project (e.g. to resolve static URLs), which never needs them
+brotli = None
+rcssmin = None
+rjsmin = None
+igzip = None
+xxhash = None
+zopfli = None
+zstandard = None
+_libraries_loaded = False
 
 logger = logging.getLogger(__name__)
 
 
+# Jobs are sent to worker processes in chunks of up to _CHUNK_SIZE files
+# or _CHUNK_BYTES of content: many small files are batched to limit the
+# dispatch overhead, while large files are spread out over the workers
+_CHUNK_SIZE = 32
+_CHUNK_BYTES = 512 * 1024
+# File types compressed with brotli's text mode
+_TEXT_FILE_TYPES = frozenset(
+    ("css", "js", "html", "htm", "svg", "xml", "json", "md", "rst", "txt")
+)
+# Files from this size up use at most _BROTLI_DYNAMIC_MAX_LEVEL when
+# BROTLI_LEVEL_DYNAMIC is enabled
+_BROTLI_DYNAMIC_THRESHOLD = 256 * 1024
+_BROTLI_DYNAMIC_MAX_LEVEL = 6
+_BROTLI_MODES = ("auto", "text", "generic")
+# Files larger than this are brotli compressed in chunks of the given size
+_BROTLI_STREAM_THRESHOLD = 1024 * 1024
+_BROTLI_STREAM_CHUNK_SIZE = 64 * 1024
+# More iterations give diminishing returns at a linear CPU cost
+_ZOPFLI_ITERATIONS = 15
+# zstandard compressors reused by each thread, see _zstd_compressor()
+_zstd_compressors = threading.local()
+# Content with longer lines on average and less whitespace in its first
+# _MINIFIED_SAMPLE_SIZE bytes is considered to be minified already
+_MINIFIED_LINE_LENGTH = 200
+_MINIFIED_WHITESPACE_RATIO = 0.05
+_MINIFIED_SAMPLE_SIZE = 4096
+# Content whose first _INCOMPRESSIBLE_SAMPLE_SIZE bytes don't shrink below
+# this ratio with fast zlib compression isn't worth compressing
+_INCOMPRESSIBLE_SAMPLE_SIZE = 4096
+_INCOMPRESSIBLE_RATIO = 0.95
+
+
+def _load_libraries():
+    """Import the minification and compression libraries, once."""
+    global _libraries_loaded, brotli, rcssmin, rjsmin, igzip, xxhash, zopfli, zstandard
+    if _libraries_loaded:
+        return
+    if brotli is None:
+        import brotli
+    if rcssmin is None:
+        import rcssmin
+    if rjsmin is None:
+        import rjsmin
+    try:
+        from isal import igzip
+    except ImportError:  # pragma: no cover
+        igzip = None
+    try:
+        import xxhash
+    except ImportError:  # pragma: no cover
+        xxhash = None
+    try:
+        import zopfli.gzip
+    except ImportError:  # pragma: no cover
+        zopfli = None
+    try:
+        import zstandard
+    except ImportError:  # pragma: no cover
+        zstandard = None
+    _libraries_loaded = True
+
+
+def _looks_minified(content):
+    """Check whether content appears to be minified already.
+
+    Running the minifiers over a large bundle which is already minified
+    can take seconds for no gain, so it's detected using cheap heuristics:
+    long lines on average and very little whitespace.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    lines = content.count(b"\n") + 1
+    if len(content) / lines < _MINIFIED_LINE_LENGTH:
+        return False
+    sample = content[:_MINIFIED_SAMPLE_SIZE]
+    whitespace = sample.count(b" ") + sample.count(b"\t") + sample.count(b"\n")
+    return whitespace < len(sample) * _MINIFIED_WHITESPACE_RATIO
+
+
+def _looks_incompressible(content):
+    """Check if content is unlikely to shrink when compressed.
+
+    Fonts, images and archives are already compressed; probing a sample
+    with the fastest zlib level costs microseconds, while compressing the
+    whole file (especially with brotli) can take hundreds of milliseconds.
+    """
+    sample = content[:_INCOMPRESSIBLE_SAMPLE_SIZE]
+    if isinstance(sample, str):
+        sample = sample.encode("utf-8")
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) > len(sample) * _INCOMPRESSIBLE_RATIO
+
+
+def _minify(content, file_type, preserve_comments):
+    """Minify CSS/JS content, returning other content unchanged."""
+    _load_libraries()
+    if file_type == "css" and rcssmin:
+        try:
+            return rcssmin.cssmin(
+                content,
+                keep_bang_comments=bool(preserve_comments),
+            )
+        except Exception as e:
+            logger.error(f"CSS minification failed for {file_type}: {e}")
+            return content
+    elif file_type == "js" and rjsmin:
+        try:
+            return rjsmin.jsmin(
+                content,
+                keep_bang_comments=bool(preserve_comments),
+            )
+        except Exception as e:
+            logger.error(f"JS minification failed: {e}")
+            return content
+    return content
+
+
+def _content_digest(content):
+    """Return a 128-bit hex digest identifying content.
+
+    Digests only detect identical content (they are not used for
+    security), so the SIMD accelerated xxHash3 is used when ``xxhash``
+    is installed, falling back to BLAKE2b otherwise.
+    """
+    _load_libraries()
+    if xxhash:
+        return xxhash.xxh3_128_hexdigest(content)
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _gzip_compress(content, level):
+    """Compress content using gzip."""
+    # Clamp level to valid range (0-9)
+    level = max(0, min(9, level))
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    # zlib writes the gzip container itself (wbits=31), skipping the header
+    # assembly done by gzip.compress() and leaving the modification time at
+    # zero, so the output only depends on the content. A compressobj is used
+    # as zlib.compress() only accepts wbits since Python 3.11
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+
+def _isal_compress(content, level):
+    """Compress content to gzip using the SIMD accelerated ISA-L.
+
+    ISA-L is several times faster than zlib, but its output is larger
+    than zlib's at the same level. It only supports levels 0-3, so the
+    zlib range is mapped onto it.
+    """
+    _load_libraries()
+    # Clamp level to valid range (0-9)
+    level = max(0, min(9, level))
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    # Its header holds the current time unless told otherwise, which would
+    # change the output (and its ETag) on every collectstatic run
+    return igzip.compress(content, compresslevel=level * 3 // 9, mtime=0)
+
+
+def _zopfli_compress(content, level):
+    """Compress content to gzip using zopfli.
+
+    Zopfli's output is 3-8% smaller than zlib's best level, at a much
+    higher CPU cost. It has no levels, ``level`` is accepted for
+    compatibility with the other compression functions and ignored.
+    """
+    _load_libraries()
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return zopfli.gzip.compress(content, numiterations=_ZOPFLI_ITERATIONS)
+
+
+def _brotli_compress(content, level, text=False):
+    """Compress content using brotli.
+
+    Text mode tunes brotli's context modeling for UTF-8 input and the
+    large window improves the ratio on big bundles at little cost.
+    """
+    _load_libraries()
+    # Clamp level to valid range (0-11)
+    level = max(0, min(11, level))
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    mode = brotli.MODE_TEXT if text else brotli.MODE_GENERIC
+    if len(content) <= _BROTLI_STREAM_THRESHOLD:
+        return brotli.compress(content, mode=mode, quality=level, lgwin=24)
+    # Feed large files in chunks, the encoder then only buffers its window
+    # and the output instead of a worst-case sized copy of the whole input
+    compressor = brotli.Compressor(mode=mode, quality=level, lgwin=24)
+    view = memoryview(content)
+    output = bytearray()
+    for start in range(0, len(view), _BROTLI_STREAM_CHUNK_SIZE):
+        end = start + _BROTLI_STREAM_CHUNK_SIZE
+        output += compressor.process(view[start:end])
+    output += compressor.finish()
+    return bytes(output)
+
+
+def _zstd_compress(content, level):
+    """Compress content using zstandard."""
+    _load_libraries()
+    # Clamp level to valid range (1-22)
+    level = max(1, min(22, level))
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return _zstd_compressor(level).compress(content)
+
+
+def _zstd_compressor(level):
+    """Get the zstandard compressor for ``level``.
+
+    Compressors are reused across files, so the compression context is
+    allocated once per level instead of for every file. They must not be
+    used by several threads at once, so each thread gets its own.
+    """
+    compressors = getattr(_zstd_compressors, "by_level", None)
+    if compressors is None:
+        compressors = _zstd_compressors.by_level = {}
+    compressor = compressors.get(level)
+    if compressor is None:
+        compressor = compressors[level] = zstandard.ZstdCompressor(level=level)
+    return compressor
+
+
+def _cached_compress(cache_dir, content, algorithm, level, compress):
+    """Compress content, reusing results cached in ``cache_dir``.
+
+    Entries are keyed by the digest of the input plus the algorithm and
+    level, so unchanged files are not compressed again on later runs.
+    Caching is disabled when ``cache_dir`` is empty.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if not cache_dir:
+        return compress(content, level)
+    key = f"{_content_digest(content)}-{algorithm}-{level}"
+    cache_path = os.path.join(cache_dir, key)
+    try:
+        with open(cache_path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+    compressed = compress(content, level)
+    # Write to a unique temporary file first so readers never see partial
+    # entries, even when several threads or processes write the same key
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix=".tmp", dir=cache_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Failed to write compression cache entry {cache_path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return compressed
+
+
+def _cached_gzip_compress(cache_dir, content, level, use_zopfli, use_isal=False):
+    """Gzip compress content with zlib, zopfli or ISA-L.
+
+    The backend is part of the cache key, as their output differs.
+    """
+    if use_zopfli:
+        return _cached_compress(cache_dir, content, "gz-zopfli", 0, _zopfli_compress)
+    if use_isal:
+        return _cached_compress(cache_dir, content, "gz-isal", level, _isal_compress)
+    return _cached_compress(cache_dir, content, "gz-zlib", level, _gzip_compress)
+
+
+def _cached_brotli_compress(cache_dir, content, file_type, level, dynamic, mode="auto"):
+    """Brotli compress content using the mode and quality suited to it.
+
+    ``mode`` is ``"text"``, ``"generic"`` or ``"auto"`` to pick text mode
+    for text file types.
+    """
+    if dynamic and len(content) >= _BROTLI_DYNAMIC_THRESHOLD:
+        # The highest qualities are an order of magnitude slower on large
+        # files while only shaving off a few more bytes
+        level = min(level, _BROTLI_DYNAMIC_MAX_LEVEL)
+    if mode == "text" or (mode == "auto" and file_type in _TEXT_FILE_TYPES):
+        compress = partial(_brotli_compress, text=True)
+        return _cached_compress(cache_dir, content, "br-text", level, compress)
+    return _cached_compress(cache_dir, content, "br", level, _brotli_compress)
+
+
+def _cached_minify(cache_dir, content, file_type, preserve_comments):
+    """Minify UTF-8 content, reusing results cached in ``cache_dir``.
+
+    Entries share the compression cache, keyed by the digest of the input
+    plus the file type, minifier version and comment handling. Raises
+    ``UnicodeDecodeError`` if the content is not UTF-8 text.
+    """
+    _load_libraries()
+    minifier = rcssmin if file_type == "css" else rjsmin
+    algorithm = f"min-{file_type}-{getattr(minifier, '__version__', '')}"
+
+    def minify(data, level):
+        minified = _minify(data.decode("utf-8"), file_type, preserve_comments)
+        return minified.encode("utf-8")
+
+    level = int(bool(preserve_comments))
+    return _cached_compress(cache_dir, content, algorithm, level, minify)
+
+
+def _minify_one(
+    path, content, file_type, preserve_comments, options=None, cache_dir=None
+):
+    """Minify a single file, returning ``(path, minified, outputs, error)``.
+
+    Runs in a worker process, so it must not touch storage or settings.
+    ``minified`` is the UTF-8 encoded minified content, or ``None`` when
+    the content is not UTF-8 text or when minification would not reduce
+    its size. When compression ``options`` are given the same encoded
+    content is compressed right away, so it does not have to be read
+    back from storage; ``outputs`` then maps the compressed file
+    extension to its content. Results are cached in ``cache_dir``.
+    """
+    try:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        # Minified content is encoded once, then written and compressed as is
+        try:
+            minified = _cached_minify(cache_dir, content, file_type, preserve_comments)
+        except UnicodeDecodeError:
+            return path, None, None, None
+        if len(minified) >= len(content):
+            return path, None, None, None
+    except Exception as e:
+        return path, None, None, e
+    if not options:
+        return path, minified, None, None
+    if len(minified) < options["min_size"]:
+        return path, minified, {}, None
+    _, outputs, error = _compress_one(path, minified, file_type, options)
+    return path, minified, outputs, error
+
+
+def _compress_one(path, content, file_type, options):
+    """Compress a single file, returning ``(path, outputs, error)``.
+
+    Runs in a worker process, so it must not touch storage or settings.
+    ``outputs`` maps the compressed file extension to its content.
+    """
+    try:
+        outputs = {}
+        if _looks_incompressible(content):
+            return path, outputs, None
+        if options["gzip"]:
+            outputs["gz"] = _cached_gzip_compress(
+                options["cache_dir"],
+                content,
+                options["gzip_level"],
+                options["zopfli"],
+                options["isal"],
+            )
+        if options["brotli"]:
+            outputs["br"] = _cached_brotli_compress(
+                options["cache_dir"],
+                content,
+                file_type,
+                options["brotli_level"],
+                options["brotli_dynamic"],
+                options["brotli_mode"],
+            )
+        if options["zstd"]:
+            outputs["zst"] = _cached_compress(
+                options["cache_dir"],
+                content,
+                "zst",
+                options["zstd_level"],
+                _zstd_compress,
+            )
+        return path, outputs, None
+    except Exception as e:
+        return path, None, e
+
+
+def _relative_path(path):
+    """Convert an absolute path to a relative one, keeping its directories."""
+    if not os.path.isabs(path):
+        return path
+    # Plain string operations rather than pathlib, this runs for every
+    # minified and compressed file; drop the drive (e.g. "C:") and root
+    return os.path.splitdrive(path)[1].lstrip("/" + os.sep)
+
+
+def _get_mp_context():
+    """Get the multiprocessing context used to start worker processes.
+
+    Files are read and written from threads while the workers are
+    started, and forking a multi-threaded process can deadlock the child
+    (e.g. on a lock held by a storage client), so workers are started
+    from a fork server where available, otherwise spawned.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _run_chunk(func, chunk):
+    """Run ``func`` over a chunk of job argument tuples."""
+    return [func(*job) for job in chunk]
+
+
+def _iter_chunks(jobs, size, max_bytes):
+    """Split jobs into lists of ``size`` jobs or ``max_bytes`` of content.
+
+    The content is the second item of each job argument tuple.
+    """
+    chunk = []
+    chunk_bytes = 0
+    for job in jobs:
+        chunk.append(job)
+        chunk_bytes += len(job[1])
+        if len(chunk) >= size or chunk_bytes >= max_bytes:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+    if chunk:
+        yield chunk
+
+
+class _InMemoryContentFile(ContentFile):
+    """ContentFile passing its whole content to storages in one chunk.
+
+    The content is already in memory, so storages writing chunks (e.g.
+    FileSystemStorage) get the original object instead of a copy of each
+    64 KiB slice; storages reading the file object are unaffected.
+    """
+
+    def chunks(self, chunk_size=None):
+        self.seek(0)
+        yield self.file.getvalue()
+
+
 class FileProcessorMixin:
     """Mixin providing file processing capabilities."""
 
@@ -29,6 +485,10 @@ class FileProcessorMixin:
         """Check if file should be minified."""
         if not get_setting("MINIFY_FILES", DEFAULT_SETTINGS["MINIFY_FILES"]):
             return False
+        return self._is_minifiable(path)
+
+    def _is_minifiable(self, path):
+        """Check if file is eligible for minification, ignoring settings."""
         if not self.file_manager.should_process(path):
             return False
         return self._get_file_type(path) in ["css", "js"]
@@ -39,188 +499,354 @@ class FileProcessorMixin:
             return False
         if allow_min:
             # When allowing min files, just check extension
-            ext = Path(path).suffix.lower()
             supported = self.file_manager.supported_extensions
-            if isinstance(supported, dict):
-                supported = list(supported.keys())
-            if ext.lstrip(".") not in supported:
+            if self._get_file_type(path) not in supported:
                 return False
         return self.file_manager.is_compression_candidate(path)
 
     def _get_file_type(self, path):
         """Get file type from path."""
-        return Path(path).suffix.lower().lstrip(".")
+        # Plain string operations, this is called several times per file
+        return os.path.splitext(path)[1][1:].lower()
+
+    def _get_max_files(self):
+        """Get maximum number of files to process per run."""
+        return (
+            get_setting("MAX_FILES_PER_RUN", DEFAULT_SETTINGS["MAX_FILES_PER_RUN"])
+            or 1000
+        )
+
+    def _get_max_file_size(self):
+        """Get maximum size of files read for processing."""
+        return (
+            get_setting("MAX_FILE_SIZE", DEFAULT_SETTINGS["MAX_FILE_SIZE"]) or 10485760
+        )
+
+    def _get_preserve_comments(self):
+        """Check whether license comments are kept when minifying."""
+        preserve_comments = get_setting(
+            "PRESERVE_COMMENTS", DEFAULT_SETTINGS["PRESERVE_COMMENTS"]
+        )
+        if preserve_comments is None:
+            return True
+        return preserve_comments
 
-    def minify_file_content(self, content, file_type):
+    def _get_workers(self):
+        """Get number of worker processes for CPU-bound work."""
+        workers = get_setting("WORKERS", DEFAULT_SETTINGS["WORKERS"])
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and multiprocessing.current_process().daemon:
+            # e.g. Celery prefork workers, which can't start child processes
+            logger.warning(
+                "Daemonic processes can't start worker processes, "
+                "processing files serially"
+            )
+            return 1
+        return workers
+
+    def _get_io_workers(self):
+        """Get number of threads used to write files to storage."""
+        io_workers = get_setting("IO_WORKERS", DEFAULT_SETTINGS["IO_WORKERS"])
+        return io_workers or 1
+
+    def _get_cache_dir(self):
+        """Get directory used to cache minified and compressed output across runs."""
+        cache_dir = get_setting("CACHE_DIR", DEFAULT_SETTINGS["CACHE_DIR"])
+        return os.fspath(cache_dir) if cache_dir else None
+
+    def _run_jobs(self, func, jobs):
+        """Yield ``func(*job)`` for each job, in order.
+
+        Jobs are dispatched in chunks to a process pool so minification
+        and compression use all available cores, while only a bounded
+        number of chunks (and thus file contents) is in flight at once.
+        Work runs serially when a single worker is configured or when
+        there are too few jobs to make a pool worth starting.
+        """
+        workers = self._get_workers()
+        chunks = _iter_chunks(jobs, _CHUNK_SIZE, _CHUNK_BYTES)
+        first = next(chunks, [])
+        second = next(chunks, None) if workers > 1 else None
+        if second is None:
+            for chunk in chain([first], chunks):
+                yield from _run_chunk(func, chunk)
+            return
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_get_mp_context()
+        ) as executor:
+            pending = deque()
+            for chunk in chain([first, second], chunks):
+                pending.append(executor.submit(_run_chunk, func, chunk))
+                if len(pending) > workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def minify_file_content(self, content, file_type, preserve_comments=None):
         """Minify file content based on type."""
-        if file_type == "css" and rcssmin:
-            try:
-                preserve_comments = get_setting(
-                    "PRESERVE_COMMENTS", DEFAULT_SETTINGS["PRESERVE_COMMENTS"]
-                )
-                if preserve_comments is None:
-                    preserve_comments = True
-                return rcssmin.cssmin(
-                    content,
-                    keep_bang_comments=bool(preserve_comments),
-                )
-            except Exception as e:
-                logger.error(f"CSS minification failed for {file_type}: {e}")
-                return content
-        elif file_type == "js" and rjsmin:
-            try:
-                preserve_comments = get_setting(
-                    "PRESERVE_COMMENTS", DEFAULT_SETTINGS["PRESERVE_COMMENTS"]
-                )
-                if preserve_comments is None:
-                    preserve_comments = True
-                return rjsmin.jsmin(
-                    content,
-                    keep_bang_comments=bool(preserve_comments),
-                )
-            except Exception as e:
-                logger.error(f"JS minification failed: {e}")
-                return content
-        return content
+        if preserve_comments is None:
+            preserve_comments = self._get_preserve_comments()
+        return _minify(content, file_type, preserve_comments)
 
 
 class MinificationMixin(FileProcessorMixin):
     """Mixin for handling CSS/JS minification."""
 
-    def process_minification(self, paths):
-        """Process minification for given paths."""
+    def process_minification(self, paths, compress=False, options=None):
+        """Process minification for given paths.
+
+        With ``compress`` the minified files are also compressed as part
+        of the same job, instead of being read back in a separate pass,
+        using the given compression ``options`` or the current settings.
+        Files skipped for being minified already are compressed as they are.
+        """
         if not get_setting("MINIFY_FILES", DEFAULT_SETTINGS["MINIFY_FILES"]):
             return {}
+        # Settings are read once here rather than for each file
+        preserve_comments = self._get_preserve_comments()
+        if not compress:
+            options = None
+        elif options is None:
+            options = self._get_compression_options()
+        max_files = self._get_max_files()
         minified_files = {}
-        max_files = (
-            get_setting("MAX_FILES_PER_RUN", DEFAULT_SETTINGS["MAX_FILES_PER_RUN"])
-            or 1000
+        already_minified = []
+        jobs = self._iter_minification_jobs(
+            paths, preserve_comments, options, self._get_cache_dir(), already_minified
         )
-        processed_count = 0
-
-        for path in paths:
-            if processed_count >= max_files:
+        for path, minified_content, outputs, error in self._run_jobs(_minify_one, jobs):
+            # Only save if minification reduced size
+            if minified_content is None:
+                if error is not None:
+                    logger.error(f"Failed to minify {path}: {error}")
+                continue
+            # Only files actually minified count towards the limit
+            if len(minified_files) >= max_files:
                 logger.warning(f"Reached maximum file processing limit ({max_files})")
                 break
-            if not self.should_process_minification(path):
+            # Create minified path: dir/name.{hash}.min.ext
+            # Keeps Django's hash and inserts .min before extension
+            # Input: notifications.f70142e76f9c.js
+            # Output: notifications.f70142e76f9c.min.js
+            parent, stem, suffix = split_path(path)
+            minified_path = join_path(parent, f"{stem}.min{suffix}")
+            # Save minified content
+            self._write_file_content(minified_path, minified_content)
+            minified_files[path] = minified_path
+            if error is not None:
+                logger.error(f"Failed to compress {minified_path}: {error}")
+            elif outputs:
+                self._save_compressed_files(minified_path, outputs)
+        if options and already_minified:
+            self.process_compression(already_minified, options=options)
+        return minified_files
+
+    def _iter_minification_jobs(
+        self,
+        paths,
+        preserve_comments,
+        options=None,
+        cache_dir=None,
+        already_minified=None,
+    ):
+        """Read files eligible for minification and yield worker jobs.
+
+        Files whose content is minified already are not yielded, they are
+        added to ``already_minified`` when given.
+        """
+        max_size = self._get_max_file_size()
+        candidates = (path for path in paths if self._is_minifiable(path))
+        for path, content, error in self._iter_file_contents(candidates, max_size):
+            if error is not None:
+                logger.error(f"Failed to minify {path}: {error}")
                 continue
-            try:
-                content = self._read_file_content(path)
-                if content is None:
-                    continue
-                # Only process text files
-                if isinstance(content, bytes):
-                    try:
-                        content = content.decode("utf-8")
-                    except UnicodeDecodeError:
-                        continue
-                file_type = self._get_file_type(path)
-                minified_content = self.minify_file_content(content, file_type)
-                # Only save if minification reduced size
-                if len(minified_content) < len(content):
-                    # Create minified path: dir/name.{hash}.min.ext
-                    # Keeps Django's hash and inserts .min before extension
-                    # Input: notifications.f70142e76f9c.js
-                    # Output: notifications.f70142e76f9c.min.js
-                    path_obj = Path(path)
-                    parent = path_obj.parent
-                    stem = path_obj.stem
-                    suffix = path_obj.suffix
-                    minified_filename = f"{stem}.min{suffix}"
-                    if parent and str(parent) != ".":
-                        minified_path = str(parent / minified_filename)
-                    else:
-                        minified_path = minified_filename
-                    # Save minified content
-                    self._write_file_content(minified_path, minified_content)
-                    minified_files[path] = minified_path
-                    processed_count += 1
-            except Exception as e:
-                logger.error(f"Failed to minify {path}: {e}")
+            if content is None:
                 continue
-        return minified_files
+            if _looks_minified(content):
+                logger.debug(f"Skipping already minified file: {path}")
+                if already_minified is not None:
+                    already_minified.append(path)
+                continue
+            file_type = self._get_file_type(path)
+            yield path, content, file_type, preserve_comments, options, cache_dir
 
 
 class CompressionMixin(FileProcessorMixin):
     """Mixin for handling Gzip/Brotli compression."""
 
-    def process_compression(self, paths, allow_min=False):
-        """Process compression for given paths."""
-        if not (
-            get_setting("GZIP_COMPRESSION", DEFAULT_SETTINGS["GZIP_COMPRESSION"])
-            or get_setting("BROTLI_COMPRESSION", DEFAULT_SETTINGS["BROTLI_COMPRESSION"])
-        ):
+    def process_compression(self, paths, allow_min=False, options=None):
+        """Process compression for given paths.
+
+        ``options`` are the compression options to use, as returned by
+        ``_get_compression_options()``; read from settings if omitted.
+        """
+        if options is None:
+            options = self._get_compression_options()
+        if options is None:
             return {}
+        max_files = self._get_max_files()
+        processed_count = 0
         compressed_files = {}
-        max_files = (
-            get_setting("MAX_FILES_PER_RUN", DEFAULT_SETTINGS["MAX_FILES_PER_RUN"])
-            or 1000
+        # Files with identical content are compressed once and the output
+        # is written under each of their names
+        digests = {}
+        duplicates = []
+        outputs_by_digest = {}
+        jobs = self._iter_compression_jobs(
+            paths, allow_min, options, digests, duplicates
         )
-        processed_count = 0
-
-        for path in paths:
+        for path, outputs, error in self._run_jobs(_compress_one, jobs):
+            if error is not None:
+                logger.error(f"Failed to compress {path}: {error}")
+                continue
+            # Only files actually compressed count towards the limit
+            if processed_count >= max_files:
+                logger.warning(f"Reached maximum file processing limit ({max_files})")
+                return compressed_files
+            processed_count += 1
+            outputs_by_digest[digests[path]] = outputs
+            if not outputs:
+                logger.debug(f"Skipping incompressible file: {path}")
+            self._save_compressed_files(path, outputs, compressed_files)
+        for path in duplicates:
+            outputs = outputs_by_digest.get(digests[path])
+            if outputs is None:
+                continue
             if processed_count >= max_files:
                 logger.warning(f"Reached maximum file processing limit ({max_files})")
                 break
-            if not self.should_process_compression(path, allow_min=allow_min):
+            processed_count += 1
+            self._save_compressed_files(path, outputs, compressed_files)
+        return compressed_files
+
+    def _get_compression_options(self):
+        """Get compression options passed to workers, ``None`` if disabled."""
+        use_gzip = get_setting("GZIP_COMPRESSION", DEFAULT_SETTINGS["GZIP_COMPRESSION"])
+        use_brotli = get_setting(
+            "BROTLI_COMPRESSION", DEFAULT_SETTINGS["BROTLI_COMPRESSION"]
+        )
+        use_zstd = get_setting("ZSTD_COMPRESSION", DEFAULT_SETTINGS["ZSTD_COMPRESSION"])
+        _load_libraries()
+        if use_zstd and zstandard is None:
+            logger.warning(
+                "Zstandard compression is enabled but zstandard is not installed"
+            )
+            use_zstd = False
+        if not (use_gzip or use_brotli or use_zstd):
+            return None
+        return {
+            "gzip": use_gzip,
+            "brotli": use_brotli,
+            "zstd": use_zstd,
+            "gzip_level": self._get_gzip_level(),
+            "zopfli": self._get_use_zopfli(),
+            "isal": self._get_use_isal(),
+            "brotli_level": self._get_brotli_level(),
+            "zstd_level": self._get_zstd_level(),
+            "brotli_dynamic": self._get_brotli_dynamic(),
+            "brotli_mode": self._get_brotli_mode(),
+            "cache_dir": self._get_cache_dir(),
+            "min_size": self.file_manager.min_file_size,
+        }
+
+    def _save_compressed_files(self, path, outputs, compressed_files=None):
+        """Write the compressed versions of ``path`` to storage.
+
+        The written paths are recorded in ``compressed_files`` when given.
+        """
+        # Get relative path for storage operations, preserving directories
+        relative_path = _relative_path(path)
+        # Write Gzip and Brotli versions
+        for extension, compressed_content in outputs.items():
+            compressed_path = f"{relative_path}.{extension}"
+            self._write_file_content(compressed_path, compressed_content, is_text=False)
+            if compressed_files is not None:
+                compressed_files.setdefault(path, []).append(compressed_path)
+
+    def _iter_compression_jobs(self, paths, allow_min, options, digests, duplicates):
+        """Read files eligible for compression and yield worker jobs.
+
+        The content digest of every file read is recorded in ``digests``;
+        files whose content was already seen are added to ``duplicates``
+        instead of being yielded again.
+        """
+        max_size = self._get_max_file_size()
+        min_size = self.file_manager.min_file_size
+        seen = set()
+        candidates = (
+            path
+            for path in paths
+            if self.should_process_compression(path, allow_min=allow_min)
+        )
+        for path, content, error in self._iter_file_contents(candidates, max_size):
+            if error is not None:
+                logger.error(f"Failed to compress {path}: {error}")
                 continue
-            try:
-                content = self._read_file_content(path)
-                if content is None:
-                    continue
-                # Get relative path for storage operations
-                # If path is absolute, convert to a relative path while preserving directory structure
-                if os.path.isabs(path):
-                    path_obj = Path(path)
-                    parts = path_obj.parts
-                    # parts[0] is the root/drive (e.g., "/" or "C:\\"); join the remaining parts
-                    if len(parts) > 1:
-                        relative_path = os.path.join(*parts[1:])
-                    else:
-                        # Fallback: if for some reason there are no extra parts, use the basename
-                        relative_path = os.path.basename(path)
-                else:
-                    relative_path = path
-                # Process Gzip compression
-                if get_setting(
-                    "GZIP_COMPRESSION", DEFAULT_SETTINGS["GZIP_COMPRESSION"]
-                ):
-                    gzipped_path = f"{relative_path}.gz"
-                    gzipped_content = self.gzip_compress(content)
-                    self._write_file_content(
-                        gzipped_path, gzipped_content, is_text=False
-                    )
-                    compressed_files.setdefault(path, []).append(gzipped_path)
-                # Process Brotli compression
-                if get_setting(
-                    "BROTLI_COMPRESSION", DEFAULT_SETTINGS["BROTLI_COMPRESSION"]
-                ):
-                    brotli_path = f"{relative_path}.br"
-                    brotli_content = self.brotli_compress(content)
-                    self._write_file_content(brotli_path, brotli_content, is_text=False)
-                    compressed_files.setdefault(path, []).append(brotli_path)
-                processed_count += 1
-            except Exception as e:
-                logger.error(f"Failed to compress {path}: {e}")
+            if content is None or len(content) < min_size:
                 continue
-        return compressed_files
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            file_type = self._get_file_type(path)
+            # Brotli output depends on the file type, so it's part of the key
+            digest = (_content_digest(content), file_type)
+            digests[path] = digest
+            if digest in seen:
+                duplicates.append(path)
+                continue
+            seen.add(digest)
+            yield path, content, file_type, options
 
-    def _read_file_content(self, path):
+    def _iter_file_contents(self, paths, max_size):
+        """Yield ``(path, content, error)`` for each path, in order.
+
+        Within ``_concurrent_writes()`` files are read ahead from its thread
+        pool, so reading (on remote storages mostly waiting for downloads)
+        overlaps with processing the files read before.
+        """
+        pool = getattr(self, "_io_pool", None)
+        if pool is None:
+            for path in paths:
+                yield (path, *self._try_read_file_content(path, max_size))
+            return
+        pending = deque()
+        for path in paths:
+            future = pool.submit(self._try_read_file_content, path, max_size)
+            pending.append((path, future))
+            if len(pending) > self._max_pending_reads:
+                path, future = pending.popleft()
+                yield (path, *future.result())
+        while pending:
+            path, future = pending.popleft()
+            yield (path, *future.result())
+
+    def _try_read_file_content(self, path, max_size):
+        """Read file content, returning ``(content, error)``."""
+        try:
+            return self._read_file_content(path, max_size), None
+        except Exception as e:
+            return None, e
+
+    def _read_file_content(self, path, max_size=None):
         """Read file content using storage methods."""
         if not is_safe_path(path):
             logger.warning(f"Skipping unsafe path: {path}")
             return None
-        max_size = (
-            get_setting("MAX_FILE_SIZE", DEFAULT_SETTINGS["MAX_FILE_SIZE"]) or 10485760
-        )
+        if max_size is None:
+            max_size = self._get_max_file_size()
         # Try storage methods first
         if self.exists(path):
+            try:
+                file_size = self.size(path)
+            except NotImplementedError:
+                file_size = None
+            if file_size is not None and file_size > max_size:
+                logger.warning(f"File too large, skipping: {path}")
+                return None
             with self.open(path) as f:
-                content = f.read()
-                if isinstance(content, bytes) and len(content) > max_size:
-                    logger.warning(f"File too large, skipping: {path}")
-                    return None
-                return content
+                content = self._read_bounded(f, file_size, max_size)
+            if content is None:
+                logger.warning(f"File too large, skipping: {path}")
+            return content
         # Fallback to local filesystem
         if os.path.exists(path):
             try:
@@ -229,49 +855,173 @@ class CompressionMixin(FileProcessorMixin):
                     logger.warning(f"File too large, skipping: {path}")
                     return None
                 with open(path, "rb") as f:
-                    return f.read()
+                    content = self._read_bounded(f, file_size, max_size)
             except OSError as e:
                 logger.error(f"Failed to read file {path}: {e}")
                 return None
+            if content is None:
+                logger.warning(f"File too large, skipping: {path}")
+            return content
         return None
 
+    def _read_bounded(self, f, file_size, max_size):
+        """Read at most ``max_size`` bytes, returning ``None`` if exceeded.
+
+        The size is checked before reading, so the content is read in a
+        single allocation of the expected size; one extra byte is requested
+        to detect files that are larger than reported.
+        """
+        limit = max_size if file_size is None else min(file_size, max_size)
+        content = f.read(limit + 1)
+        if limit < len(content) <= max_size:
+            # The file is larger than reported, read the rest up to the cap
+            content += f.read(max_size + 1 - len(content))
+        if len(content) > max_size:
+            return None
+        return content
+
     def _write_file_content(self, path, content, is_text=True):
         """Write file content using storage methods."""
         if not is_safe_path(path):
             logger.warning(f"Skipping unsafe path for writing: {path}")
             return
-        self.save(path, ContentFile(content))
+        pending = getattr(self, "_pending_writes", None)
+        if pending is None:
+            self._save_file(path, content)
+            return
+        pending.append(self._io_pool.submit(self._save_file, path, content))
+        # Bound the number of file contents waiting to be written
+        if len(pending) > self._max_pending_writes:
+            pending.popleft().result()
 
-    def gzip_compress(self, content):
-        """Compress content using gzip."""
-        buffer = io.BytesIO()
-        level = (
+    def _save_file(self, path, content):
+        """Save content under ``path``, replacing any existing file.
+
+        FileSystemStorage never overwrites files (e.g. from a previous
+        collectstatic run), so the existing file is deleted first, like
+        Django's HashedFilesMixin does. Other storages are expected to
+        overwrite (e.g. S3 with ``file_overwrite``), sparing them the
+        extra requests.
+        """
+        if isinstance(self, FileSystemStorage) and self.exists(path):
+            self.delete(path)
+        self._save(path, _InMemoryContentFile(content))
+
+    @contextmanager
+    def _concurrent_writes(self):
+        """Read and write files from a thread pool within the block.
+
+        Saving is I/O-bound (on remote storages mostly waiting for uploads),
+        so writes are overlapped instead of done one after another. The
+        block exits once every write has finished, raising the first error.
+        """
+        io_workers = self._get_io_workers()
+        if io_workers <= 1:
+            yield
+            return
+        with ThreadPoolExecutor(max_workers=io_workers) as pool:
+            self._io_pool = pool
+            self._pending_writes = deque()
+            self._max_pending_writes = io_workers * 2
+            self._max_pending_reads = io_workers * 2
+            try:
+                yield
+                while self._pending_writes:
+                    self._pending_writes.popleft().result()
+            finally:
+                self._io_pool = None
+                self._pending_writes = None
+
+    def _get_gzip_level(self):
+        """Get gzip compression level from settings."""
+        return (
             get_setting(
                 "COMPRESSION_LEVEL_GZIP", DEFAULT_SETTINGS["COMPRESSION_LEVEL_GZIP"]
             )
             or 6
         )
-        # Clamp level to valid range (0-9)
-        level = max(0, min(9, level))
-        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=level) as gz_file:
-            if isinstance(content, str):
-                content = content.encode("utf-8")
-            gz_file.write(content)
-        return buffer.getvalue()
 
-    def brotli_compress(self, content):
-        """Compress content using brotli."""
-        level = (
+    def _get_use_zopfli(self):
+        """Check whether gzip files are compressed with zopfli."""
+        use_zopfli = get_setting("USE_ZOPFLI", DEFAULT_SETTINGS["USE_ZOPFLI"])
+        _load_libraries()
+        if use_zopfli and zopfli is None:
+            logger.warning("Zopfli is enabled but zopfli is not installed")
+            return False
+        return use_zopfli
+
+    def _get_use_isal(self):
+        """Check whether gzip files are compressed with ISA-L."""
+        use_isal = get_setting("USE_ISAL", DEFAULT_SETTINGS["USE_ISAL"])
+        _load_libraries()
+        if use_isal and igzip is None:
+            logger.warning("ISA-L is enabled but isal is not installed")
+            return False
+        return use_isal
+
+    def _get_brotli_level(self):
+        """Get brotli compression level from settings."""
+        level = get_setting(
+            "COMPRESSION_LEVEL_BROTLI", DEFAULT_SETTINGS["COMPRESSION_LEVEL_BROTLI"]
+        )
+        # Level 0 is valid (and faster than 1), only fall back when unset
+        if level is None:
+            return DEFAULT_SETTINGS["COMPRESSION_LEVEL_BROTLI"]
+        return level
+
+    def _get_zstd_level(self):
+        """Get zstandard compression level from settings."""
+        return (
             get_setting(
-                "COMPRESSION_LEVEL_BROTLI", DEFAULT_SETTINGS["COMPRESSION_LEVEL_BROTLI"]
+                "COMPRESSION_LEVEL_ZSTD", DEFAULT_SETTINGS["COMPRESSION_LEVEL_ZSTD"]
             )
-            or 4
+            or DEFAULT_SETTINGS["COMPRESSION_LEVEL_ZSTD"]
+        )
+
+    def _get_brotli_mode(self):
+        """Get brotli encoder mode from settings."""
+        mode = get_setting("BROTLI_MODE", DEFAULT_SETTINGS["BROTLI_MODE"])
+        if mode not in _BROTLI_MODES:
+            logger.warning(f"Invalid brotli mode {mode!r}, using 'auto'")
+            return "auto"
+        return mode
+
+    def _get_brotli_dynamic(self):
+        """Check whether brotli quality is lowered for large files."""
+        return get_setting(
+            "BROTLI_LEVEL_DYNAMIC", DEFAULT_SETTINGS["BROTLI_LEVEL_DYNAMIC"]
+        )
+
+    def gzip_compress(self, content):
+        """Compress content using gzip."""
+        return _cached_gzip_compress(
+            self._get_cache_dir(),
+            content,
+            self._get_gzip_level(),
+            self._get_use_zopfli(),
+            self._get_use_isal(),
+        )
+
+    def brotli_compress(self, content, file_type=None):
+        """Compress content using brotli."""
+        return _cached_brotli_compress(
+            self._get_cache_dir(),
+            content,
+            file_type,
+            self._get_brotli_level(),
+            self._get_brotli_dynamic(),
+            self._get_brotli_mode(),
+        )
+
+    def zstd_compress(self, content):
+        """Compress content using zstandard."""
+        return _cached_compress(
+            self._get_cache_dir(),
+            content,
+            "zst",
+            self._get_zstd_level(),
+            _zstd_compress,
         )
-        # Clamp level to valid range (0-11)
-        level = max(0, min(11, level))
-        if isinstance(content, str):
-            content = content.encode("utf-8")
-        return brotli.compress(content, quality=level)
 
 
 @deconstructible
@@ -282,95 +1032,85 @@ class MinicompressStorage(
 
     def post_process(self, paths, dry_run=False, **options):
         """Post-process collected static files."""
-        # First, let the parent classes do their work (creates manifest with hashed names)
-        yield from super().post_process(paths, dry_run=dry_run, **options)
+        # First, let the parent classes do their work (hashes file names).
+        # Saving the manifest is deferred so that minified paths can be
+        # folded into it and it is written to storage only once.
+        self._defer_manifest = True
+        try:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+        finally:
+            self._defer_manifest = False
         if dry_run:
             return
-        # Get the list of processed paths from the manifest or use original paths
-        # Read manifest to get processed (hashed) paths
-        processed_paths = []
-        try:
-            if hasattr(self, "read_manifest"):
-                manifest_json = self.read_manifest()
-                if manifest_json:
-                    manifest = json.loads(manifest_json)
-                    processed_paths = list(manifest.get("paths", {}).values())
-        except Exception:
-            pass
-        # If no paths from manifest, use original paths
+        # Get the processed (hashed) paths or use original paths
+        processed_paths = list(self.hashed_files.values())
         if not processed_paths:
             processed_paths = list(paths.keys())
-        # Process minification
-        minified_files = self.process_minification(processed_paths)
-        # Yield minified files back to Django
-        for original, minified in minified_files.items():
-            yield original, minified, True
-        # Process compression on non-CSS/JS files (not minified, but still compressible)
-        non_minifiable_paths = [
-            p for p in processed_paths if self._get_file_type(p) not in ("css", "js")
-        ]
-        if non_minifiable_paths:
-            self.process_compression(non_minifiable_paths)
-        # Process compression on minified files with allow_min=True
-        if minified_files:
-            self.process_compression(list(minified_files.values()), allow_min=True)
-        # Update manifest with minified file paths
-        if minified_files:
-            self._update_manifest(minified_files)
+        with self._concurrent_writes():
+            # Compression settings are read once for both passes
+            compression_options = self._get_compression_options()
+            # Process minification, compressing the minified content in the
+            # same pass so it doesn't have to be read back from storage
+            minified_files = self.process_minification(
+                processed_paths, compress=True, options=compression_options
+            )
+            # Yield minified files back to Django
+            for original, minified in minified_files.items():
+                yield original, minified, True
+            # Process compression on non-CSS/JS files (not minified, but still compressible)
+            non_minifiable_paths = [
+                p
+                for p in processed_paths
+                if self._get_file_type(p) not in ("css", "js")
+            ]
+            if non_minifiable_paths:
+                # File sizes are looked up in bulk rather than file by file
+                self.file_manager.prewarm_sizes(non_minifiable_paths)
+                try:
+                    self.process_compression(
+                        non_minifiable_paths, options=compression_options
+                    )
+                finally:
+                    self.file_manager.clear_sizes()
+        # Save manifest including minified file paths
+        self._update_manifest(minified_files)
+
+    def save_manifest(self):
+        """Save manifest unless post_process is still collecting paths."""
+        if getattr(self, "_defer_manifest", False):
+            return
+        super().save_manifest()
 
     def _update_manifest(self, minified_files):
-        """Update manifest with minified file paths.
+        """Update manifest with minified file paths and save it.
 
         minified_files is a dict where: - key: the path that was minified
         (hashed path from ManifestFilesMixin) - value: the minified
-        version path
+        version path. Errors while repointing paths are logged, while
+        errors saving the manifest are raised: without a manifest no
+        static file can be resolved.
         """
-        try:
-            # Read existing manifest using Django's method
-            manifest_json = self.read_manifest()
-            if manifest_json:
-                manifest = json.loads(manifest_json)
-            else:
-                manifest = {}
-
-            if "paths" not in manifest:
-                manifest["paths"] = {}
-
-            # Update paths to point to minified versions
-            # minified_files has: {hashed_path: minified_hashed_path}
-            # manifest["paths"] has: {original_path: hashed_path}
-            # We need to find which original_path points to our hashed_path,
-            # then update it to point to minified_hashed_path
-            for hashed_path, minified_path in minified_files.items():
-                # Normalize paths
-                hashed_relative = hashed_path
-                if os.path.isabs(hashed_path):
-                    path_obj = Path(hashed_path)
-                    parts = path_obj.parts
-                    if len(parts) > 1:
-                        hashed_relative = os.path.join(*parts[1:])
-                    else:
-                        hashed_relative = os.path.basename(hashed_path)
-
-                minified_relative = minified_path
-                if os.path.isabs(minified_path):
-                    path_obj = Path(minified_path)
-                    parts = path_obj.parts
-                    if len(parts) > 1:
-                        minified_relative = os.path.join(*parts[1:])
-                    else:
-                        minified_relative = os.path.basename(minified_path)
-
-                # Find which original path maps to this hashed path
-                for original_path, current_path in manifest["paths"].items():
-                    if current_path == hashed_relative:
-                        # Update to point to minified version
-                        manifest["paths"][original_path] = minified_relative
-                        break
-            # Save updated manifest - delete old one first to avoid stale data
-            if self.exists(self.manifest_name):
-                self.delete(self.manifest_name)
-            new_manifest_contents = json.dumps(manifest).encode("utf-8")
-            self.save(self.manifest_name, ContentFile(new_manifest_contents))
-        except Exception as e:
-            logger.error(f"Failed to update manifest: {e}")
+        # Nothing to repoint otherwise, skip indexing the whole manifest
+        if minified_files:
+            try:
+                self._repoint_manifest(minified_files)
+            except Exception as e:
+                logger.error(f"Failed to update manifest: {e}")
+        self.save_manifest()
+
+    def _repoint_manifest(self, minified_files):
+        """Point manifest entries of minified files to their minified path."""
+        # minified_files has: {hashed_path: minified_hashed_path}
+        # hashed_files has: {original_path: hashed_path}
+        # A reverse index finds which original_path points to each
+        # hashed_path, which is then updated to minified_hashed_path
+        original_paths = {}
+        for original_path, current_path in self.hashed_files.items():
+            original_paths.setdefault(current_path, original_path)
+        # Normalize all paths in one go, then only dict operations remain
+        hashed_paths = list(map(_relative_path, minified_files))
+        minified_paths = list(map(_relative_path, minified_files.values()))
+        for hashed_path, minified_path in zip(hashed_paths, minified_paths):
+            original_path = original_paths.get(hashed_path)
+            if original_path is not None:
+                self.hashed_files[original_path] = minified_path
@@ -1,8 +1,10 @@
+import fnmatch
 import hashlib
 import logging
+import mmap
 import os
 import re
-from pathlib import Path
+from functools import lru_cache
 
 from django.utils.functional import cached_property
 
@@ -10,6 +12,34 @@ from .conf import DEFAULT_SETTINGS, get_setting
 
 logger = logging.getLogger(__name__)
 
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Hash suffix added to file names by create_hashed_filename
+_HASH_RE = re.compile(r"\.[a-f0-9]{12}$")
+# Formats that are compressed already, compressing them again only wastes
+# CPU time even when they are listed in SUPPORTED_EXTENSIONS
+_INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    (
+        "gz",
+        "br",
+        "zst",
+        "zip",
+        "7z",
+        "bz2",
+        "xz",
+        "png",
+        "jpg",
+        "jpeg",
+        "gif",
+        "webp",
+        "avif",
+        "woff",
+        "woff2",
+        "mp3",
+        "mp4",
+        "webm",
+    )
+)
+
 
 def is_safe_path(path, base_dir=None):
     """Validate path is safe and doesn't traverse outside base directory."""
@@ -39,12 +69,15 @@ def validate_file_size(file_size):
 def generate_file_hash(content_or_path, length=12):
     """Generate MD5 hash of file content or raw bytes.
 
-    Uses MD5 to match Django's ManifestFilesMixin hash algorithm.
+    Uses MD5 to match Django's ManifestFilesMixin hash algorithm. Files
+    are never loaded into memory at once: large files are memory-mapped
+    and hashed straight from the page cache, smaller ones in chunks.
     """
     try:
         if isinstance(content_or_path, bytes):
             # Direct content hash
-            return hashlib.md5(content_or_path).hexdigest()[:length]
+            hasher = hashlib.md5(content_or_path, usedforsecurity=False)
+            return hasher.hexdigest()[:length]
         elif isinstance(content_or_path, (str, os.PathLike)):
             # File path - read and hash (supports str and pathlib.Path)
             file_path = os.fspath(content_or_path)
@@ -52,12 +85,24 @@ def generate_file_hash(content_or_path, length=12):
                 get_setting("MAX_FILE_SIZE", DEFAULT_SETTINGS["MAX_FILE_SIZE"])
                 or 10485760
             )
+            hasher = hashlib.md5(usedforsecurity=False)
             with open(file_path, "rb") as f:
-                content = f.read(max_size + 1)
-                if len(content) > max_size:
-                    logger.warning(f"File too large for hashing, skipping: {file_path}")
-                    return ""
-                return hashlib.md5(content).hexdigest()[:length]
+                size = os.fstat(f.fileno()).st_size
+                if _HASH_CHUNK_SIZE < size <= max_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        size = len(data)
+                        if size <= max_size:
+                            hasher.update(data)
+                    # Continue with anything appended since it was mapped
+                    f.seek(size)
+                while size <= max_size and (chunk := f.read(_HASH_CHUNK_SIZE)):
+                    hasher.update(chunk)
+                    # Re-check as the file may be larger than reported
+                    size = max(size, f.tell())
+            if size > max_size:
+                logger.warning(f"File too large for hashing, skipping: {file_path}")
+                return ""
+            return hasher.hexdigest()[:length]
         else:
             logger.error(
                 f"Unsupported type for hash generation: {type(content_or_path)}"
@@ -68,21 +113,33 @@ def generate_file_hash(content_or_path, length=12):
         return ""
 
 
+def split_path(path):
+    """Split a path into its directory, stem and extension (with the dot).
+
+    Plain ``os.path`` string operations are used instead of ``pathlib``,
+    as this is done for every collected file.
+    """
+    parent, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    return parent, stem, ext
+
+
+def join_path(parent, filename):
+    """Join a directory returned by ``split_path`` with a file name."""
+    if parent and parent != ".":
+        return os.path.join(parent, filename)
+    return filename
+
+
 def create_hashed_filename(original_path, hash_value):
     """Create filename with hash inserted before extension."""
-    path = Path(original_path)
-    parent = path.parent
-    stem = path.stem
-    suffix = path.suffix
-    # If already has hash, replace it
-    hash_pattern = r"\.[a-f0-9]{12}$"
-    if re.search(hash_pattern, stem):
-        stem = re.sub(hash_pattern, "", stem)
-    new_filename = f"{stem}.{hash_value}{suffix}"
+    parent, stem, suffix = split_path(original_path)
+    # If already has hash, remove it
+    match = _HASH_RE.search(stem)
+    if match:
+        stem = stem[: match.start()]
     # Preserve directory structure
-    if parent and str(parent) != ".":
-        return str(parent / new_filename)
-    return new_filename
+    return join_path(parent, f"{stem}.{hash_value}{suffix}")
 
 
 def normalize_extension(extension):
@@ -92,27 +149,40 @@ def normalize_extension(extension):
 
 def should_process_file(file_path, supported_extensions, exclude_patterns):
     """Check if file should be processed for minification/compression."""
-    path = Path(file_path)
-    ext = normalize_extension(path.suffix)
+    exclude_re = compile_exclude_patterns(tuple(exclude_patterns or ()))
+    return _should_process_file(file_path, supported_extensions, exclude_re)
+
+
+def _should_process_file(file_path, supported_extensions, exclude_re):
+    """Same as ``should_process_file``, with exclude patterns precompiled."""
+    name = os.path.basename(file_path)
+    ext = normalize_extension(os.path.splitext(name)[1])
     # Check extension
     if not supported_extensions or ext not in supported_extensions:
         return False
     # Check exclude patterns
-    filename = path.name
-    for pattern in exclude_patterns or []:
-        # Handle simple glob patterns
-        if pattern == "*.min.*" and ".min." in filename:
-            return False
-        elif pattern == "*-min.*" and "-min." in filename:
-            return False
-        elif pattern.startswith("*") and filename.endswith(pattern[1:]):
-            return False
-        elif filename.endswith(pattern):
-            return False
-
+    if exclude_re is not None and exclude_re.match(name):
+        return False
     return True
 
 
+@lru_cache(maxsize=32)
+def compile_exclude_patterns(patterns):
+    """Compile glob exclude patterns into a single regular expression.
+
+    Patterns without wildcards match file names ending with them, e.g.
+    ``.min.css`` is the same as ``*.min.css``. Returns ``None`` when there
+    are no patterns.
+    """
+    if not patterns:
+        return None
+    globs = (
+        pattern if any(c in pattern for c in "*?[") else f"*{pattern}"
+        for pattern in patterns
+    )
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+
+
 def get_file_size(file_path):
     """Get file size in bytes."""
     try:
@@ -127,6 +197,7 @@ class FileManager:
 
     def __init__(self, storage):
         self.storage = storage
+        self._size_cache = {}
 
     @cached_property
     def supported_extensions(self):
@@ -142,6 +213,11 @@ class FileManager:
         result = get_setting("EXCLUDE_PATTERNS", DEFAULT_SETTINGS["EXCLUDE_PATTERNS"])
         return result or []
 
+    @cached_property
+    def exclude_regex(self):
+        """Get exclude patterns compiled into a single regular expression."""
+        return compile_exclude_patterns(tuple(self.exclude_patterns))
+
     @cached_property
     def min_file_size(self):
         """Get minimum file size for compression."""
@@ -157,13 +233,45 @@ class FileManager:
             extensions = list(extensions.keys())
         else:
             extensions = extensions or []
-        return should_process_file(
-            file_path, extensions, getattr(self, "exclude_patterns", None) or []
-        )
+        return _should_process_file(file_path, extensions, self.exclude_regex)
+
+    def prewarm_sizes(self, paths):
+        """Cache the size of ``paths``, scanning each directory once.
+
+        ``is_compression_candidate`` then looks sizes up instead of
+        resolving the storage path of every file and checking it on its
+        own. Storages without local paths are left uncached.
+        """
+        names_by_dir = {}
+        for path in paths:
+            directory, name = os.path.split(path)
+            names_by_dir.setdefault(directory, {})[name] = path
+        sizes = {}
+        for directory, names in names_by_dir.items():
+            try:
+                with os.scandir(self.storage.path(directory)) as entries:
+                    for entry in entries:
+                        path = names.get(entry.name)
+                        if path is not None and entry.is_file():
+                            sizes[path] = entry.stat().st_size
+            except Exception as e:
+                logger.debug(f"Could not scan storage directory {directory}: {e}")
+        self._size_cache = sizes
+
+    def clear_sizes(self):
+        """Forget the sizes cached by ``prewarm_sizes``."""
+        self._size_cache = {}
 
     def is_compression_candidate(self, file_path):
-        """Check if file is candidate for compression (size check)."""
+        """Check if file is candidate for compression (type and size check)."""
+        # Checked first, as it doesn't need to access the file
+        ext = normalize_extension(os.path.splitext(file_path)[1])
+        if ext in _INCOMPRESSIBLE_EXTENSIONS:
+            return False
         min_size = getattr(self, "min_file_size", None) or 200
+        size = self._size_cache.get(file_path)
+        if size is not None:
+            return size >= min_size
         # Try to get full path from storage first
         if hasattr(self.storage, "path"):
             try:
@@ -26,6 +26,18 @@ setup(
         "brotli>=1.2.0,<2.0.0",
     ],
     extras_require={
+        "isal": [
+            "isal>=1.6.0,<2.0.0",
+        ],
+        "xxhash": [
+            "xxhash>=3.0.0,<5.0.0",
+        ],
+        "zopfli": [
+            "zopfli>=0.2.0,<1.0.0",
+        ],
+        "zstd": [
+            "zstandard>=0.18.0,<1.0.0",
+        ],
         "test": [
             "openwisp-utils[qa]~=1.2.2",
         ],
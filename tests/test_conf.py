@@ -42,6 +42,15 @@ class DefaultSettingsTests(TestCase):
         self.assertEqual(DEFAULT_SETTINGS["MAX_FILE_SIZE"], 10485760)
         self.assertEqual(DEFAULT_SETTINGS["COMPRESSION_LEVEL_GZIP"], 6)
         self.assertEqual(DEFAULT_SETTINGS["COMPRESSION_LEVEL_BROTLI"], 4)
+        self.assertEqual(DEFAULT_SETTINGS["COMPRESSION_LEVEL_ZSTD"], 15)
+        self.assertFalse(DEFAULT_SETTINGS["USE_ZOPFLI"])
+        self.assertFalse(DEFAULT_SETTINGS["USE_ISAL"])
+        self.assertEqual(DEFAULT_SETTINGS["BROTLI_MODE"], "auto")
+        self.assertFalse(DEFAULT_SETTINGS["ZSTD_COMPRESSION"])
+        self.assertEqual(DEFAULT_SETTINGS["WORKERS"], 1)
+        self.assertEqual(DEFAULT_SETTINGS["IO_WORKERS"], 16)
+        self.assertIsNone(DEFAULT_SETTINGS["CACHE_DIR"])
+        self.assertFalse(DEFAULT_SETTINGS["BROTLI_LEVEL_DYNAMIC"])
 
     def test_supported_extensions(self):
         """Test SUPPORTED_EXTENSIONS has required types."""
@@ -50,6 +50,16 @@ class _TestableSecurityMinification(MinificationMixin, CompressionMixin):
         self.saved_files[path] = full_path
         return path
 
+    def _save(self, path, content):
+        return self.save(path, content)
+
+    def delete(self, path):
+        self.saved_files.pop(path, None)
+        os.remove(os.path.join(self.temp_dir, path))
+
+    def size(self, path):
+        return os.path.getsize(os.path.join(self.temp_dir, path))
+
     def path(self, name):
         return os.path.join(self.temp_dir, name)
 
@@ -140,6 +150,18 @@ class MaxFilesPerRunTests(TestCase):
         # Should only process 2 files
         self.assertEqual(len(result), 2)
 
+    @override_settings(MINICOMPRESS_MAX_FILES_PER_RUN=2)
+    def test_max_files_limit_counts_minified_files(self):
+        """Test files that minification doesn't shrink don't use up the limit."""
+        paths = []
+        for i in range(3):
+            paths.append(f"minimal{i}.css")
+            with open(os.path.join(self.minifier.temp_dir, paths[-1]), "w") as f:
+                f.write(f"a{i}{{b:c}}")
+        paths += [f"style{i}.css" for i in range(5)]
+        result = self.minifier.process_minification(paths)
+        self.assertEqual(list(result), ["style0.css", "style1.css"])
+
     @override_settings(MINICOMPRESS_MAX_FILES_PER_RUN=2)
     def test_max_files_limit_compression(self):
         """Test that only MAX_FILES_PER_RUN files are compressed."""
@@ -323,29 +345,20 @@ class ManifestUpdateTests(TestCase):
 
     def test_update_manifest_original_not_in_manifest(self):
         """Test manifest update when original path not in manifest."""
-        # Test the branch where original not in manifest (line 347)
-        # We'll patch _update_manifest to test this specific branch
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create storage with STATIC_ROOT set
             with override_settings(STATIC_ROOT=temp_dir):
                 storage = MinicompressStorage()
-
-            # Create an existing manifest with some entries
-            manifest_path = os.path.join(temp_dir, "staticfiles.json")
-            with open(manifest_path, "w") as f:
-                json.dump({"existing.css": "existing.min.abc123.css"}, f)
-
+            # Existing manifest entries
+            storage.hashed_files = {"existing.css": "existing.abc123.css"}
             # Update with files where original not in manifest
             minified_files = {"new.css": "new.min.xyz789.css"}
-
-            # Call _update_manifest
             storage._update_manifest(minified_files)
-
             # Manifest should have original entry but not new one
+            manifest_path = os.path.join(temp_dir, "staticfiles.json")
             with open(manifest_path, "r") as f:
-                manifest = json.load(f)
-            self.assertIn("existing.css", manifest)
-            self.assertNotIn("new.css", manifest)
+                manifest = json.load(f)["paths"]
+            self.assertEqual(manifest, {"existing.css": "existing.abc123.css"})
 
 
 class OSExceptionHandlingTests(TestCase):
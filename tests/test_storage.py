@@ -1,15 +1,24 @@
 """Tests for storage functionality."""
 
 import gzip
+import hashlib
 import json
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+from unittest.mock import patch
 
 import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from django_minify_compress_staticfiles import storage as storage_module
 from django_minify_compress_staticfiles.storage import (
     CompressionMixin,
     FileProcessorMixin,
@@ -17,6 +26,10 @@ from django_minify_compress_staticfiles.storage import (
     MinificationMixin,
 )
 
+# Libraries are imported lazily, load them so they can be patched and
+# checked by skipUnless()
+storage_module._load_libraries()
+
 
 class MockStorage:
     """Mock storage for testing mixins."""
@@ -54,6 +67,16 @@ class MockStorage:
         self.saved_files[path] = full_path
         return path
 
+    def _save(self, path, content):
+        return self.save(path, content)
+
+    def delete(self, path):
+        self.saved_files.pop(path, None)
+        os.remove(os.path.join(self.temp_dir, path))
+
+    def size(self, path):
+        return os.path.getsize(os.path.join(self.temp_dir, path))
+
     def path(self, name):
         return os.path.join(self.temp_dir, name)
 
@@ -93,6 +116,10 @@ class FileProcessorMixinTests(TestCase):
         self.assertEqual(self.processor._get_file_type("style.css"), "css")
         self.assertEqual(self.processor._get_file_type("app.js"), "js")
         self.assertEqual(self.processor._get_file_type("/path/to/style.css"), "css")
+        self.assertEqual(self.processor._get_file_type("STYLE.CSS"), "css")
+        self.assertEqual(self.processor._get_file_type("app.min.js"), "js")
+        self.assertEqual(self.processor._get_file_type("dir.v2/README"), "")
+        self.assertEqual(self.processor._get_file_type(".htaccess"), "")
 
     def test_should_process_minification(self):
         """Test minification eligibility checks."""
@@ -257,6 +284,106 @@ class MinificationMixinTests(TestCase):
                 f"Compressed file should match pattern 'ow-dashboard.{{hash}}.min.js.{{ext}}', got: {cf}",
             )
 
+    def test_process_minification_with_compression(self):
+        """Test minified content is compressed without reading it back."""
+        test_file = os.path.join(self.minifier.temp_dir, "app.f48d1c0ecbf2.js")
+        with open(test_file, "w") as f:
+            f.write("function test() {\n    console.log('test');\n}" * 50)
+        with patch.object(
+            self.minifier,
+            "_read_file_content",
+            wraps=self.minifier._read_file_content,
+        ) as mock_read:
+            result = self.minifier.process_minification(
+                ["app.f48d1c0ecbf2.js"], compress=True
+            )
+        mock_read.assert_called_once()
+        self.assertEqual(mock_read.call_args.args[0], "app.f48d1c0ecbf2.js")
+        minified_path = result["app.f48d1c0ecbf2.js"]
+        self.assertEqual(minified_path, "app.f48d1c0ecbf2.min.js")
+        with open(os.path.join(self.minifier.temp_dir, minified_path), "rb") as f:
+            minified = f.read()
+        with open(
+            os.path.join(self.minifier.temp_dir, f"{minified_path}.gz"), "rb"
+        ) as f:
+            self.assertEqual(gzip.decompress(f.read()), minified)
+        with open(
+            os.path.join(self.minifier.temp_dir, f"{minified_path}.br"), "rb"
+        ) as f:
+            self.assertEqual(brotli.decompress(f.read()), minified)
+
+    def test_minify_one_encodes_once(self):
+        """Test minified content is encoded once and compressed as is."""
+        content = b"function test() {\n    console.log('test');\n}" * 50
+        options = self.minifier._get_compression_options()
+        with patch.object(
+            storage_module, "_compress_one", wraps=storage_module._compress_one
+        ) as mock_compress:
+            path, minified, outputs, error = storage_module._minify_one(
+                "app.js", content, "js", True, options
+            )
+        self.assertIsNone(error)
+        self.assertIsInstance(minified, bytes)
+        self.assertIs(mock_compress.call_args.args[1], minified)
+        self.assertEqual(gzip.decompress(outputs["gz"]), minified)
+
+    def test_minification_cache(self):
+        """Test minified content is cached across runs."""
+        cache_dir = os.path.join(self.minifier.temp_dir, "cache")
+        with open(os.path.join(self.minifier.temp_dir, "app.js"), "w") as f:
+            f.write("function test() {\n    console.log('test');\n}" * 50)
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            result = self.minifier.process_minification(["app.js"])
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            with open(os.path.join(self.minifier.temp_dir, result["app.js"]), "w") as f:
+                f.write("stale")
+            with patch.object(storage_module, "_minify") as mock_minify:
+                cached = self.minifier.process_minification(["app.js"])
+            mock_minify.assert_not_called()
+        self.assertEqual(cached, result)
+        with open(os.path.join(self.minifier.temp_dir, result["app.js"])) as f:
+            self.assertEqual(f.read(), "function test(){console.log('test');}" * 50)
+
+    def test_minify_one_not_utf8(self):
+        """Test content that isn't UTF-8 text is not minified."""
+        result = storage_module._minify_one("app.js", b"\xff\xfe var a;", "js", True)
+        self.assertEqual(result, ("app.js", None, None, None))
+
+    def test_process_minification_with_compression_error(self):
+        """Test the minified file is kept when compressing it fails."""
+        test_file = os.path.join(self.minifier.temp_dir, "app.js")
+        with open(test_file, "w") as f:
+            f.write("function test() {\n    console.log('test');\n}" * 50)
+        with patch.object(
+            storage_module, "_gzip_compress", side_effect=Exception("Gzip error")
+        ):
+            result = self.minifier.process_minification(["app.js"], compress=True)
+        self.assertEqual(result, {"app.js": "app.min.js"})
+        self.assertTrue(
+            os.path.exists(os.path.join(self.minifier.temp_dir, "app.min.js"))
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.minifier.temp_dir, "app.min.js.gz"))
+        )
+
+    def test_process_minification_reads_settings_once(self):
+        """Test settings are looked up once per run, not once per file."""
+
+        def count_lookups(count):
+            paths = []
+            for i in range(count):
+                paths.append(f"app{i}.js")
+                with open(os.path.join(self.minifier.temp_dir, paths[-1]), "w") as f:
+                    f.write(f"function test{i}() {{\n    return {i};\n}}\n" * 20)
+            with patch.object(
+                storage_module, "get_setting", wraps=storage_module.get_setting
+            ) as mock_get_setting:
+                result = self.minifier.process_minification(paths, compress=True)
+            self.assertEqual(len(result), count)
+            return mock_get_setting.call_count
+
+        self.assertEqual(count_lookups(1), count_lookups(10))
+
     def test_process_minification_with_directory(self):
         """Test minification preserves directory structure."""
         os.makedirs(os.path.join(self.minifier.temp_dir, "css"), exist_ok=True)
@@ -299,11 +426,102 @@ class MinificationMixinTests(TestCase):
         finally:
             DEFAULT_SETTINGS["MAX_FILES_PER_RUN"] = original_max
 
+    def test_looks_minified(self):
+        """Test detection of content which is already minified."""
+        minified = b"var a=function(b){return b+1},c=a(2),d=c*2;" * 50
+        self.assertTrue(storage_module._looks_minified(minified))
+        self.assertTrue(storage_module._looks_minified(minified.decode()))
+        # Readable code has short lines
+        self.assertFalse(
+            storage_module._looks_minified(b"function a(b) {\n    return b;\n}\n" * 50)
+        )
+        # Long lines with plenty of whitespace are still minified
+        self.assertFalse(storage_module._looks_minified(b"body { margin: 0; } " * 50))
+
+    def test_process_minification_skips_minified_content(self):
+        """Test the minifier is not run on content which is already minified."""
+        with open(os.path.join(self.minifier.temp_dir, "vendor.js"), "w") as f:
+            f.write("var a=function(b){return b+1},c=a(2),d=c*2;" * 50)
+        with patch("django_minify_compress_staticfiles.storage._minify") as mock_minify:
+            result = self.minifier.process_minification(["vendor.js"])
+        mock_minify.assert_not_called()
+        self.assertEqual(result, {})
+
     def test_process_minification_unsafe_path(self):
         """Test that unsafe paths are skipped."""
         result = self.minifier.process_minification(["../etc/passwd"])
         self.assertEqual(result, {})
 
+    @override_settings(MINICOMPRESS_WORKERS=2)
+    def test_process_minification_parallel(self):
+        """Test files are minified and compressed by a process pool."""
+        paths = []
+        for i in range(70):
+            paths.append(f"app{i}.js")
+            with open(os.path.join(self.minifier.temp_dir, paths[-1]), "w") as f:
+                f.write(f"function test{i}() {{\n    return {i};\n}}\n" * 20)
+        with patch.object(
+            storage_module,
+            "ProcessPoolExecutor",
+            wraps=storage_module.ProcessPoolExecutor,
+        ) as mock_executor:
+            result = self.minifier.process_minification(paths)
+        mock_executor.assert_called_once()
+        self.assertEqual(mock_executor.call_args.kwargs["max_workers"], 2)
+        # Workers are not forked from the multi-threaded process
+        mp_context = mock_executor.call_args.kwargs["mp_context"]
+        self.assertIn(mp_context.get_start_method(), ("forkserver", "spawn"))
+        self.assertEqual(list(result), paths)
+        compressed = self.minifier.process_compression(
+            list(result.values()), allow_min=True
+        )
+        self.assertEqual(len(compressed), 70)
+        for i, path in enumerate(paths):
+            with open(os.path.join(self.minifier.temp_dir, result[path]), "rb") as f:
+                minified = f.read()
+            self.assertIn(f"return {i}".encode(), minified)
+            with open(
+                os.path.join(self.minifier.temp_dir, f"{result[path]}.gz"), "rb"
+            ) as f:
+                self.assertEqual(gzip.decompress(f.read()), minified)
+
+    def test_iter_chunks(self):
+        """Test jobs are chunked by count and by content size."""
+        small = [(f"{i}.css", b"x" * 10) for i in range(70)]
+        chunks = list(storage_module._iter_chunks(small, 32, 1024))
+        self.assertEqual([len(c) for c in chunks], [32, 32, 6])
+        self.assertEqual([job for c in chunks for job in c], small)
+        large = [(f"{i}.css", b"x" * 600) for i in range(5)]
+        chunks = list(storage_module._iter_chunks(large, 32, 1024))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(list(storage_module._iter_chunks([], 32, 1024)), [])
+
+    @override_settings(MINICOMPRESS_WORKERS=4)
+    def test_get_workers_daemon_process(self):
+        """Test daemonic processes don't start worker processes."""
+        self.assertEqual(self.minifier._get_workers(), 4)
+        with patch.object(
+            storage_module.multiprocessing, "current_process"
+        ) as mock_process:
+            mock_process.return_value.daemon = True
+            with self.assertLogs(storage_module.logger, "WARNING"):
+                self.assertEqual(self.minifier._get_workers(), 1)
+
+    @override_settings(MINICOMPRESS_WORKERS=1)
+    def test_process_minification_serial(self):
+        """Test files are processed in-process when a single worker is set."""
+        paths = []
+        for i in range(20):
+            paths.append(f"style{i}.css")
+            with open(os.path.join(self.minifier.temp_dir, paths[-1]), "w") as f:
+                f.write(f".c{i} {{\n    margin: {i}px;\n}}\n" * 20)
+        with patch(
+            "django_minify_compress_staticfiles.storage.ProcessPoolExecutor"
+        ) as mock_executor:
+            result = self.minifier.process_minification(paths)
+        mock_executor.assert_not_called()
+        self.assertEqual(len(result), 20)
+
 
 class CompressionMixinTests(TestCase):
     """Tests for CompressionMixin."""
@@ -314,6 +532,86 @@ class CompressionMixinTests(TestCase):
     def tearDown(self):
         self.compressor.cleanup()
 
+    @override_settings(MINICOMPRESS_IO_WORKERS=4)
+    def test_concurrent_writes(self):
+        """Test files are saved from a thread pool within the block."""
+        threads = set()
+        original_save = self.compressor.save
+
+        def save(path, content):
+            threads.add(threading.current_thread())
+            return original_save(path, content)
+
+        with patch.object(self.compressor, "save", side_effect=save):
+            with self.compressor._concurrent_writes():
+                for i in range(20):
+                    self.compressor._write_file_content(f"file{i}.txt", f"data {i}")
+        self.assertNotIn(threading.current_thread(), threads)
+        for i in range(20):
+            with open(os.path.join(self.compressor.temp_dir, f"file{i}.txt")) as f:
+                self.assertEqual(f.read(), f"data {i}")
+        self.assertIsNone(self.compressor._pending_writes)
+
+    @override_settings(MINICOMPRESS_IO_WORKERS=4)
+    def test_concurrent_writes_error(self):
+        """Test write errors are raised when leaving the block."""
+        with patch.object(self.compressor, "save", side_effect=OSError("Disk full")):
+            with self.assertRaises(OSError):
+                with self.compressor._concurrent_writes():
+                    self.compressor._write_file_content("file.txt", "data")
+
+    @override_settings(MINICOMPRESS_IO_WORKERS=4, MINICOMPRESS_WORKERS=1)
+    def test_concurrent_reads(self):
+        """Test files are read ahead from the thread pool, in order."""
+        paths = []
+        for i in range(20):
+            paths.append(f"file{i}.txt")
+            with open(os.path.join(self.compressor.temp_dir, paths[-1]), "w") as f:
+                f.write(f"data {i} " * 100)
+        threads = set()
+        original_read = self.compressor._read_file_content
+
+        def read(path, max_size=None):
+            threads.add(threading.current_thread())
+            return original_read(path, max_size)
+
+        with patch.object(self.compressor, "_read_file_content", side_effect=read):
+            with self.compressor._concurrent_writes():
+                result = self.compressor.process_compression(paths)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(list(result), paths)
+
+    def test_iter_file_contents_error(self):
+        """Test read errors are returned along with the path."""
+        error = OSError("Read failed")
+        with patch.object(self.compressor, "_read_file_content", side_effect=error):
+            result = list(self.compressor._iter_file_contents(["a.css"], 100))
+        self.assertEqual(result, [("a.css", None, error)])
+
+    def test_save_file_overwriting_storage(self):
+        """Test storages other than FileSystemStorage are not asked to delete."""
+        with patch.object(self.compressor, "exists") as mock_exists:
+            with patch.object(self.compressor, "delete") as mock_delete:
+                self.compressor._save_file("file.txt", b"data")
+        mock_exists.assert_not_called()
+        mock_delete.assert_not_called()
+        with open(os.path.join(self.compressor.temp_dir, "file.txt"), "rb") as f:
+            self.assertEqual(f.read(), b"data")
+
+    @override_settings(MINICOMPRESS_IO_WORKERS=1)
+    def test_concurrent_writes_disabled(self):
+        """Test files are saved in the calling thread with one IO worker."""
+        with patch(
+            "django_minify_compress_staticfiles.storage.ThreadPoolExecutor"
+        ) as mock_executor:
+            with self.compressor._concurrent_writes():
+                self.compressor._write_file_content("file.txt", "data")
+        mock_executor.assert_not_called()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.compressor.temp_dir, "file.txt"))
+        )
+
     def test_gzip_compress(self):
         """Test gzip compression."""
         content = "Hello World! " * 100
@@ -323,6 +621,88 @@ class CompressionMixinTests(TestCase):
         # Verify decompression
         self.assertEqual(gzip.decompress(compressed).decode("utf-8"), content)
 
+    def test_gzip_compress_zlib(self):
+        """Test gzip compression uses zlib unless ISA-L is enabled."""
+        content = "Hello World! " * 100
+        with patch.object(storage_module, "_isal_compress") as mock_isal:
+            compressed = self.compressor.gzip_compress(content)
+        mock_isal.assert_not_called()
+        self.assertEqual(gzip.decompress(compressed).decode("utf-8"), content)
+        # Valid gzip header without a modification time
+        self.assertEqual(compressed[:4], b"\x1f\x8b\x08\x00")
+        self.assertEqual(compressed[4:8], b"\x00\x00\x00\x00")
+        self.assertEqual(self.compressor.gzip_compress(content), compressed)
+
+    @skipUnless(storage_module.igzip, "isal is not installed")
+    @override_settings(MINICOMPRESS_USE_ISAL=True)
+    def test_gzip_compress_isal_reproducible(self):
+        """Test ISA-L gzip output has no modification time."""
+        content = b"body { margin: 0; }" * 100
+        compressed = self.compressor.gzip_compress(content)
+        self.assertEqual(gzip.decompress(compressed), content)
+        self.assertEqual(compressed[4:8], b"\x00\x00\x00\x00")
+        with patch("time.time", return_value=1234567890.0):
+            self.assertEqual(self.compressor.gzip_compress(content), compressed)
+
+    @override_settings(MINICOMPRESS_USE_ISAL=True)
+    def test_gzip_compress_isal_not_installed(self):
+        """Test gzip compression falls back to zlib without isal."""
+        content = b"body { margin: 0; }" * 100
+        with patch.object(storage_module, "igzip", None):
+            with self.assertLogs(storage_module.logger, "WARNING"):
+                compressed = self.compressor.gzip_compress(content)
+        self.assertEqual(gzip.decompress(compressed), content)
+
+    @skipUnless(storage_module.igzip, "isal is not installed")
+    def test_gzip_compress_isal_cache_key(self):
+        """Test ISA-L and zlib output don't share cache entries."""
+        cache_dir = os.path.join(self.compressor.temp_dir, "cache")
+        content = b"body { margin: 0; }" * 100
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            zlib_output = self.compressor.gzip_compress(content)
+            with override_settings(MINICOMPRESS_USE_ISAL=True):
+                isal_output = self.compressor.gzip_compress(content)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+        self.assertEqual(isal_output, storage_module._isal_compress(content, 6))
+        self.assertEqual(zlib_output, storage_module._gzip_compress(content, 6))
+
+    @skipUnless(storage_module.zopfli, "zopfli is not installed")
+    @override_settings(MINICOMPRESS_USE_ZOPFLI=True)
+    def test_gzip_compress_zopfli(self):
+        """Test gzip files are compressed with zopfli when enabled."""
+        content = b"body { margin: 0; }" * 100
+        with patch.object(
+            storage_module.zopfli.gzip,
+            "compress",
+            wraps=storage_module.zopfli.gzip.compress,
+        ) as mock_compress:
+            compressed = self.compressor.gzip_compress(content)
+        mock_compress.assert_called_once_with(content, numiterations=15)
+        self.assertEqual(gzip.decompress(compressed), content)
+
+    @override_settings(MINICOMPRESS_USE_ZOPFLI=True)
+    def test_gzip_compress_zopfli_not_installed(self):
+        """Test gzip compression falls back to zlib without zopfli."""
+        content = b"body { margin: 0; }" * 100
+        with patch.object(storage_module, "zopfli", None):
+            with self.assertLogs(storage_module.logger, "WARNING"):
+                compressed = self.compressor.gzip_compress(content)
+        self.assertEqual(gzip.decompress(compressed), content)
+
+    @skipUnless(storage_module.igzip, "isal is not installed")
+    @override_settings(MINICOMPRESS_USE_ISAL=True)
+    def test_gzip_compress_isal_level(self):
+        """Test gzip levels are scaled to the range supported by ISA-L."""
+        with patch.object(
+            storage_module.igzip, "compress", return_value=b""
+        ) as mock_compress:
+            with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_GZIP=9):
+                self.compressor.gzip_compress(b"content")
+            mock_compress.assert_called_with(b"content", compresslevel=3, mtime=0)
+            with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_GZIP=6):
+                self.compressor.gzip_compress(b"content")
+            mock_compress.assert_called_with(b"content", compresslevel=2, mtime=0)
+
     def test_brotli_compress(self):
         """Test brotli compression."""
         content = "Hello World! " * 100
@@ -332,6 +712,242 @@ class CompressionMixinTests(TestCase):
         # Verify decompression
         self.assertEqual(brotli.decompress(compressed).decode("utf-8"), content)
 
+    def test_brotli_compress_mode(self):
+        """Test brotli uses text mode for text files and generic otherwise."""
+        content = b"body { margin: 0; }" * 100
+        with patch.object(
+            storage_module.brotli, "compress", wraps=brotli.compress
+        ) as mock_compress:
+            compressed = self.compressor.brotli_compress(content, "css")
+            self.assertEqual(mock_compress.call_args.kwargs["mode"], brotli.MODE_TEXT)
+            self.compressor.brotli_compress(content, "woff")
+            self.assertEqual(
+                mock_compress.call_args.kwargs["mode"], brotli.MODE_GENERIC
+            )
+            self.assertEqual(mock_compress.call_args.kwargs["lgwin"], 24)
+        self.assertEqual(brotli.decompress(compressed), content)
+
+    def test_brotli_mode_setting(self):
+        """Test the brotli mode can be forced for all files."""
+        content = b"body { margin: 0; }" * 100
+        with patch.object(brotli, "compress", wraps=brotli.compress) as mock_compress:
+            with override_settings(MINICOMPRESS_BROTLI_MODE="generic"):
+                self.compressor.brotli_compress(content, "css")
+            self.assertEqual(
+                mock_compress.call_args.kwargs["mode"], brotli.MODE_GENERIC
+            )
+            with override_settings(MINICOMPRESS_BROTLI_MODE="text"):
+                self.compressor.brotli_compress(content, "woff")
+            self.assertEqual(mock_compress.call_args.kwargs["mode"], brotli.MODE_TEXT)
+            with override_settings(MINICOMPRESS_BROTLI_MODE="invalid"):
+                with self.assertLogs(storage_module.logger, "WARNING"):
+                    self.compressor.brotli_compress(content, "css")
+            self.assertEqual(mock_compress.call_args.kwargs["mode"], brotli.MODE_TEXT)
+
+    def test_brotli_compress_streaming(self):
+        """Test large files are brotli compressed in chunks."""
+        content = os.urandom(1024) * 1536
+        with patch.object(
+            storage_module.brotli, "compress", wraps=brotli.compress
+        ) as mock_compress:
+            compressed = self.compressor.brotli_compress(content, "js")
+        mock_compress.assert_not_called()
+        self.assertEqual(brotli.decompress(compressed), content)
+        self.assertEqual(
+            compressed,
+            brotli.compress(content, mode=brotli.MODE_TEXT, quality=4, lgwin=24),
+        )
+
+    def test_brotli_level_dynamic(self):
+        """Test brotli quality is capped for large files when enabled."""
+        small = b"x" * 1024
+        large = b"x" * (256 * 1024)
+        with patch.object(
+            storage_module.brotli, "compress", return_value=b""
+        ) as mock_compress:
+            with override_settings(
+                MINICOMPRESS_COMPRESSION_LEVEL_BROTLI=11,
+                MINICOMPRESS_BROTLI_LEVEL_DYNAMIC=True,
+            ):
+                self.compressor.brotli_compress(small)
+                self.assertEqual(mock_compress.call_args.kwargs["quality"], 11)
+                self.compressor.brotli_compress(large)
+                self.assertEqual(mock_compress.call_args.kwargs["quality"], 6)
+            with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_BROTLI=11):
+                self.compressor.brotli_compress(large)
+                self.assertEqual(mock_compress.call_args.kwargs["quality"], 11)
+            with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_BROTLI=0):
+                self.compressor.brotli_compress(small)
+                self.assertEqual(mock_compress.call_args.kwargs["quality"], 0)
+
+    def test_content_digest(self):
+        """Test content digests with and without xxhash installed."""
+        digest = storage_module._content_digest(b"content")
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(digest, storage_module._content_digest(b"content"))
+        self.assertNotEqual(digest, storage_module._content_digest(b"other"))
+        with patch("django_minify_compress_staticfiles.storage.xxhash", None):
+            self.assertEqual(
+                storage_module._content_digest(b"content"),
+                hashlib.blake2b(b"content", digest_size=16).hexdigest(),
+            )
+
+    def test_compression_cache(self):
+        """Test compressed output is reused from the cache directory."""
+        cache_dir = os.path.join(self.compressor.temp_dir, "cache")
+        content = b"Hello World! " * 100
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            compressed = self.compressor.brotli_compress(content)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            with patch(
+                "django_minify_compress_staticfiles.storage._brotli_compress"
+            ) as mock_compress:
+                self.assertEqual(self.compressor.brotli_compress(content), compressed)
+                mock_compress.assert_not_called()
+            # Different levels use different cache entries
+            with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_BROTLI=5):
+                self.compressor.brotli_compress(content)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    @skipUnless(storage_module.zstandard, "zstandard is not installed")
+    def test_zstd_compress(self):
+        """Test zstandard compression."""
+        content = "Hello World! " * 100
+        compressed = self.compressor.zstd_compress(content)
+        self.assertLess(len(compressed), len(content))
+        decompressed = storage_module.zstandard.ZstdDecompressor().decompress(
+            compressed
+        )
+        self.assertEqual(decompressed.decode("utf-8"), content)
+        with override_settings(MINICOMPRESS_COMPRESSION_LEVEL_ZSTD=99):
+            self.assertIsInstance(self.compressor.zstd_compress(content), bytes)
+
+    @skipUnless(storage_module.zstandard, "zstandard is not installed")
+    def test_zstd_compressor_reused(self):
+        """Test zstandard compressors are reused across files in each thread."""
+        compressor = storage_module._zstd_compressor(3)
+        self.assertIs(storage_module._zstd_compressor(3), compressor)
+        # Compressors are not shared between threads
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(storage_module._zstd_compressor(3))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], compressor)
+        decompressor = storage_module.zstandard.ZstdDecompressor()
+        for content in (b"first file " * 50, b"second file " * 50):
+            compressed = storage_module._zstd_compress(content, 3)
+            self.assertEqual(decompressor.decompress(compressed), content)
+
+    @skipUnless(storage_module.zstandard, "zstandard is not installed")
+    @override_settings(MINICOMPRESS_ZSTD_COMPRESSION=True)
+    def test_process_compression_zstd(self):
+        """Test .zst files are written when zstandard compression is enabled."""
+        content = b"body { margin: 0; }" * 100
+        with open(os.path.join(self.compressor.temp_dir, "style.css"), "wb") as f:
+            f.write(content)
+        result = self.compressor.process_compression(["style.css"])
+        self.assertEqual(
+            result, {"style.css": ["style.css.gz", "style.css.br", "style.css.zst"]}
+        )
+        with open(os.path.join(self.compressor.temp_dir, "style.css.zst"), "rb") as f:
+            decompressed = storage_module.zstandard.ZstdDecompressor().decompress(
+                f.read()
+            )
+        self.assertEqual(decompressed, content)
+
+    @override_settings(
+        MINICOMPRESS_ZSTD_COMPRESSION=True,
+        MINICOMPRESS_GZIP_COMPRESSION=False,
+        MINICOMPRESS_BROTLI_COMPRESSION=False,
+    )
+    def test_process_compression_zstd_not_installed(self):
+        """Test zstandard compression is skipped when it's not installed."""
+        with open(os.path.join(self.compressor.temp_dir, "style.css"), "w") as f:
+            f.write("body { margin: 0; }" * 100)
+        with patch.object(storage_module, "zstandard", None):
+            result = self.compressor.process_compression(["style.css"])
+        self.assertEqual(result, {})
+
+    def test_looks_incompressible(self):
+        """Test incompressible content is detected from a sample."""
+        self.assertTrue(storage_module._looks_incompressible(os.urandom(8192)))
+        self.assertFalse(storage_module._looks_incompressible(b"body{}" * 1000))
+        self.assertFalse(storage_module._looks_incompressible("body{}" * 1000))
+        self.assertFalse(storage_module._looks_incompressible(b""))
+
+    def test_process_compression_skips_incompressible(self):
+        """Test no compressed versions are written for incompressible files."""
+        with open(os.path.join(self.compressor.temp_dir, "data.txt"), "wb") as f:
+            f.write(os.urandom(8192))
+        with open(os.path.join(self.compressor.temp_dir, "style.css"), "w") as f:
+            f.write("body { margin: 0; }" * 100)
+        with patch.object(
+            storage_module, "_brotli_compress", wraps=storage_module._brotli_compress
+        ) as mock_brotli:
+            result = self.compressor.process_compression(["data.txt", "style.css"])
+        self.assertEqual(result, {"style.css": ["style.css.gz", "style.css.br"]})
+        self.assertEqual(mock_brotli.call_count, 1)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.compressor.temp_dir, "data.txt.gz"))
+        )
+
+    def test_compression_cache_process_compression(self):
+        """Test process_compression stores and reuses cache entries."""
+        cache_dir = os.path.join(self.compressor.temp_dir, "cache")
+        with open(os.path.join(self.compressor.temp_dir, "style.css"), "w") as f:
+            f.write("body { margin: 0; }" * 100)
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            self.compressor.process_compression(["style.css"])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            with patch(
+                "django_minify_compress_staticfiles.storage._gzip_compress"
+            ) as mock_gzip:
+                result = self.compressor.process_compression(["style.css"])
+            mock_gzip.assert_not_called()
+        self.assertEqual(result, {"style.css": ["style.css.gz", "style.css.br"]})
+        with open(os.path.join(self.compressor.temp_dir, "style.css.gz"), "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"body { margin: 0; }" * 100)
+
+    def test_compression_cache_write_error(self):
+        """Test compression still succeeds when the cache cannot be written."""
+        cache_dir = os.path.join(self.compressor.temp_dir, "cache")
+        content = b"Hello World! " * 100
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            with patch("os.replace", side_effect=OSError("Read-only")):
+                compressed = self.compressor.gzip_compress(content)
+        self.assertEqual(gzip.decompress(compressed), content)
+        self.assertEqual(os.listdir(cache_dir), [])
+
+    def test_compression_cache_concurrent_writes(self):
+        """Test threads writing the same cache entry use distinct temp files."""
+        cache_dir = os.path.join(self.compressor.temp_dir, "cache")
+        content = b"Hello World! " * 100
+        barrier = threading.Barrier(2)
+        tmp_paths = []
+        replace = os.replace
+
+        def synced_replace(src, dst):
+            # Both threads have written their temp file before either moves it
+            tmp_paths.append(src)
+            barrier.wait(timeout=5)
+            replace(src, dst)
+
+        with override_settings(MINICOMPRESS_CACHE_DIR=cache_dir):
+            with patch("os.replace", side_effect=synced_replace):
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    results = list(
+                        executor.map(
+                            lambda _: self.compressor.gzip_compress(content), range(2)
+                        )
+                    )
+        self.assertEqual(len(set(tmp_paths)), 2)
+        self.assertEqual(results[0], results[1])
+        entries = os.listdir(cache_dir)
+        self.assertEqual(len(entries), 1)
+        self.assertFalse(entries[0].endswith(".tmp"))
+
     def test_process_compression_with_absolute_path(self):
         """Test compression handles absolute paths correctly."""
         test_file = os.path.join(self.compressor.temp_dir, "large.css")
@@ -344,6 +960,31 @@ class CompressionMixinTests(TestCase):
         self.assertIn(abs_path, result)
         self.assertTrue(any(path.endswith(".gz") for path in result[abs_path]))
 
+    def test_process_compression_identical_files(self):
+        """Test files with identical content are only compressed once."""
+        for name in ("a.css", "b.css"):
+            with open(os.path.join(self.compressor.temp_dir, name), "w") as f:
+                f.write("body { margin: 0; }" * 100)
+        with patch(
+            "django_minify_compress_staticfiles.storage._compress_one",
+            wraps=storage_module._compress_one,
+        ) as mock_compress:
+            result = self.compressor.process_compression(["a.css", "b.css"])
+        self.assertEqual(mock_compress.call_count, 1)
+        self.assertEqual(result["b.css"], ["b.css.gz", "b.css.br"])
+        with open(os.path.join(self.compressor.temp_dir, "b.css.br"), "rb") as f:
+            self.assertEqual(brotli.decompress(f.read()), b"body { margin: 0; }" * 100)
+
+    def test_process_compression_small_content(self):
+        """Test content smaller than MIN_FILE_SIZE is not compressed."""
+        with open(os.path.join(self.compressor.temp_dir, "a.css"), "w") as f:
+            f.write("body { margin: 0; }" * 100)
+        with patch.object(
+            self.compressor, "_read_file_content", return_value=b"body{}"
+        ):
+            result = self.compressor.process_compression(["a.css"])
+        self.assertEqual(result, {})
+
     def test_read_file_content_fallback(self):
         """Test _read_file_content falls back to local filesystem."""
         test_file = os.path.join(self.compressor.temp_dir, "test.txt")
@@ -353,12 +994,58 @@ class CompressionMixinTests(TestCase):
         content = self.compressor._read_file_content(test_file)
         self.assertEqual(content, b"test content")
 
+    @override_settings(MINICOMPRESS_MAX_FILE_SIZE=100)
+    def test_read_file_content_size_checked_first(self):
+        """Test files larger than MAX_FILE_SIZE are skipped without reading."""
+        with open(os.path.join(self.compressor.temp_dir, "large.css"), "w") as f:
+            f.write("x" * 101)
+        with patch.object(self.compressor, "open") as mock_open:
+            self.assertIsNone(self.compressor._read_file_content("large.css"))
+        mock_open.assert_not_called()
+
+    @override_settings(MINICOMPRESS_MAX_FILE_SIZE=100)
+    def test_read_file_content_size_not_implemented(self):
+        """Test reads are bounded when the storage does not report sizes."""
+        for name, length in (("small.css", 100), ("large.css", 101)):
+            with open(os.path.join(self.compressor.temp_dir, name), "w") as f:
+                f.write("x" * length)
+        with patch.object(self.compressor, "size", side_effect=NotImplementedError):
+            self.assertEqual(
+                self.compressor._read_file_content("small.css"), b"x" * 100
+            )
+            self.assertIsNone(self.compressor._read_file_content("large.css"))
+
+    @override_settings(MINICOMPRESS_MAX_FILE_SIZE=100)
+    def test_read_file_content_larger_than_reported(self):
+        """Test files larger than their reported size are read entirely."""
+        for name, length in (("grown.css", 80), ("too-large.css", 120)):
+            with open(os.path.join(self.compressor.temp_dir, name), "w") as f:
+                f.write("x" * length)
+        with patch.object(self.compressor, "size", return_value=50):
+            self.assertEqual(self.compressor._read_file_content("grown.css"), b"x" * 80)
+            self.assertIsNone(self.compressor._read_file_content("too-large.css"))
+
     def test_read_file_content_missing(self):
         """Test _read_file_content returns None for missing files."""
         content = self.compressor._read_file_content("/nonexistent/file.txt")
         self.assertIsNone(content)
 
 
+class LazyImportTests(TestCase):
+    """Tests for lazily imported libraries."""
+
+    def test_storage_import_does_not_load_libraries(self):
+        """Test importing the storage doesn't import minifiers and codecs."""
+        code = (
+            "import sys, django_minify_compress_staticfiles.storage; "
+            "print(sorted({'brotli', 'rcssmin', 'rjsmin'} & set(sys.modules)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
 class MinicompressStorageTests(TestCase):
     """Tests for MinicompressStorage class."""
 
@@ -428,6 +1115,49 @@ class MinicompressStorageTests(TestCase):
             results = list(storage.post_process(paths, dry_run=False))
             self.assertIsInstance(results, list)
 
+    def test_update_manifest_many_paths(self):
+        """Test manifest entries are repointed to their minified paths."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            storage.hashed_files = {
+                f"app{i}.js": f"app{i}.abc{i}.js" for i in range(100)
+            }
+            minified_files = {
+                os.path.join(os.sep, f"app{i}.abc{i}.js"): f"app{i}.abc{i}.min.js"
+                for i in range(0, 100, 2)
+            }
+            with patch.object(storage, "save_manifest") as mock_save:
+                storage._update_manifest(minified_files)
+            mock_save.assert_called_once()
+            for i in range(100):
+                expected = (
+                    f"app{i}.abc{i}.min.js" if i % 2 == 0 else f"app{i}.abc{i}.js"
+                )
+                self.assertEqual(storage.hashed_files[f"app{i}.js"], expected)
+
+    def test_update_manifest_nothing_minified(self):
+        """Test manifest is saved unchanged when nothing was minified."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            storage.hashed_files = {"img.png": "img.abc.png"}
+            with patch.object(storage, "save_manifest") as mock_save:
+                storage._update_manifest({})
+            mock_save.assert_called_once()
+            self.assertEqual(storage.hashed_files, {"img.png": "img.abc.png"})
+
+    def test_relative_path(self):
+        """Test absolute paths are made relative, keeping directories."""
+        self.assertEqual(storage_module._relative_path("css/a.css"), "css/a.css")
+        self.assertEqual(
+            storage_module._relative_path(os.path.join(os.sep, "css", "a.css")),
+            os.path.join("css", "a.css"),
+        )
+        self.assertEqual(storage_module._relative_path(os.sep), "")
+        self.assertEqual(
+            storage_module._relative_path(os.path.join(os.sep, "a", "b", "c.js")),
+            os.path.join("a", "b", "c.js"),
+        )
+
     def test_process_minification_error_handling(self):
         """Test that minification errors are caught and logged."""
         with self.settings(STATIC_ROOT=self.static_root):
@@ -436,19 +1166,14 @@ class MinicompressStorageTests(TestCase):
             test_file = os.path.join(self.static_root, "style.css")
             with open(test_file, "w") as f:
                 f.write("body { margin: 0; }" * 20)
-            # Mock the minify_file_content to raise an exception
-            original_minify = storage.minify_file_content
-
-            def mock_minify_error(content, file_type):
-                raise Exception("Test error")
-
-            storage.minify_file_content = mock_minify_error
-            try:
+            # Mock the minifier to raise an exception
+            with patch(
+                "django_minify_compress_staticfiles.storage._minify",
+                side_effect=Exception("Test error"),
+            ):
                 result = storage.process_minification(["style.css"])
                 # Should return empty dict on error, not crash
                 self.assertEqual(result, {})
-            finally:
-                storage.minify_file_content = original_minify
 
     def test_read_file_content_with_size_limit(self):
         """Test _read_file_content respects MAX_FILE_SIZE setting."""
@@ -483,19 +1208,14 @@ class MinicompressStorageTests(TestCase):
             test_file = os.path.join(self.static_root, "style.css")
             with open(test_file, "w") as f:
                 f.write("body { margin: 0; }" * 50)
-            # Mock gzip_compress to raise an exception
-            original_gzip = storage.gzip_compress
-
-            def mock_gzip_error(content):
-                raise Exception("Test gzip error")
-
-            storage.gzip_compress = mock_gzip_error
-            try:
+            # Mock gzip compression to raise an exception
+            with patch(
+                "django_minify_compress_staticfiles.storage._gzip_compress",
+                side_effect=Exception("Test gzip error"),
+            ):
                 result = storage.process_compression(["style.css"])
-                # Should complete without crashing, even if empty
-                self.assertIsInstance(result, dict)
-            finally:
-                storage.gzip_compress = original_gzip
+                # Should complete without crashing, skipping the failed file
+                self.assertEqual(result, {})
 
     def test_post_process_dry_run_no_files_created(self):
         """Test dry_run prevents minification and compression."""
@@ -637,23 +1357,23 @@ class MinicompressStorageTests(TestCase):
             self.assertEqual(result, {})
 
     def test_manifest_update_error_handling(self):
-        """Test manifest update handles errors gracefully."""
+        """Test repointing errors are logged, but save errors are raised."""
         with self.settings(STATIC_ROOT=self.static_root):
             storage = MinicompressStorage()
-            # Create a minified files dict
             minified_files = {"style.css": "style.min.abc123.css"}
-            # Mock save to raise an exception
-            original_save = storage.save
-
-            def mock_save_error(name, content):
-                raise Exception("Manifest save error")
-
-            storage.save = mock_save_error
-            try:
-                # Should not raise an exception
-                storage._update_manifest(minified_files)
-            finally:
-                storage.save = original_save
+            with patch.object(
+                storage_module, "_relative_path", side_effect=Exception("Bad path")
+            ):
+                with patch.object(storage, "save_manifest") as mock_save:
+                    with self.assertLogs(storage_module.logger, "ERROR"):
+                        storage._update_manifest(minified_files)
+            mock_save.assert_called_once()
+            # Without a manifest no static file could be resolved
+            with patch.object(
+                storage, "save_manifest", side_effect=OSError("Manifest save error")
+            ):
+                with self.assertRaises(OSError):
+                    storage._update_manifest(minified_files)
 
     def test_manifest_structure_with_minified_files(self):
         """Test that manifest has proper structure for Django to serve minified files.
@@ -710,6 +1430,136 @@ class MinicompressStorageTests(TestCase):
                     f"File {original_path} should map to minified version, got {mapped_path}",
                 )
 
+    def test_write_file_content_single_chunk(self):
+        """Test content is handed to the storage without being sliced."""
+        content = os.urandom(1024) * 200
+        chunks = list(storage_module._InMemoryContentFile(content).chunks())
+        self.assertEqual(len(chunks), 1)
+        self.assertIs(chunks[0], content)
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            storage._write_file_content("data.bin.gz", content, is_text=False)
+            with open(os.path.join(self.static_root, "data.bin.gz"), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_post_process_reads_compression_settings_once(self):
+        """Test compression settings are read once for both passes."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            with open(os.path.join(self.static_root, "style.css"), "w") as f:
+                f.write("body {\n    margin: 0;\n    padding: 0;\n}" * 20)
+            with open(os.path.join(self.static_root, "data.txt"), "w") as f:
+                f.write("Hello World! " * 100)
+            paths = {
+                "style.css": (storage, "style.css"),
+                "data.txt": (storage, "data.txt"),
+            }
+            with patch.object(
+                storage,
+                "_get_compression_options",
+                wraps=storage._get_compression_options,
+            ) as mock_options:
+                list(storage.post_process(paths, dry_run=False))
+            mock_options.assert_called_once()
+            files = os.listdir(self.static_root)
+        self.assertEqual(len([f for f in files if f.endswith(".min.css.gz")]), 1)
+        self.assertEqual(len([f for f in files if f.endswith(".txt.gz")]), 1)
+
+    def test_post_process_compresses_already_minified(self):
+        """Test files skipped as already minified are still compressed."""
+        content = "var a=function(b){return b+1},c=a(2),d=c*2;" * 50
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            with open(os.path.join(self.static_root, "bundle.js"), "w") as f:
+                f.write(content)
+            paths = {"bundle.js": (storage, "bundle.js")}
+            list(storage.post_process(paths, dry_run=False))
+            hashed_path = storage.hashed_files["bundle.js"]
+        self.assertNotIn(".min.", hashed_path)
+        gz_path = os.path.join(self.static_root, f"{hashed_path}.gz")
+        with open(gz_path, "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()).decode(), content)
+        br_path = os.path.join(self.static_root, f"{hashed_path}.br")
+        with open(br_path, "rb") as f:
+            self.assertEqual(brotli.decompress(f.read()).decode(), content)
+
+    def test_post_process_overwrites_previous_run(self):
+        """Test running post_process again replaces the generated files."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            with open(os.path.join(self.static_root, "style.css"), "w") as f:
+                f.write("body {\n    margin: 0;\n    padding: 0;\n}" * 20)
+            for _ in range(2):
+                storage = MinicompressStorage()
+                paths = {"style.css": (storage, "style.css")}
+                list(storage.post_process(paths, dry_run=False))
+            files = os.listdir(self.static_root)
+        # style.css, style.{hash}.css, .min.css, .min.css.gz, .min.css.br
+        # and staticfiles.json, without copies under alternative names
+        self.assertEqual(len(files), 6, files)
+        self.assertEqual(len([f for f in files if f.endswith(".min.css.gz")]), 1)
+
+    def test_post_process_saves_manifest_once(self):
+        """Test the manifest is written once, already including minified paths."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            with open(os.path.join(self.static_root, "style.css"), "w") as f:
+                f.write("body {\n    margin: 0;\n    padding: 0;\n}" * 20)
+            paths = {"style.css": (storage, "style.css")}
+            with patch.object(storage, "_save", wraps=storage._save) as mock_save:
+                list(storage.post_process(paths, dry_run=False))
+            manifest_saves = [
+                c
+                for c in mock_save.call_args_list
+                if c.args[0] == storage.manifest_name
+            ]
+            self.assertEqual(len(manifest_saves), 1)
+            with open(os.path.join(self.static_root, storage.manifest_name)) as f:
+                manifest = json.load(f)
+            self.assertRegex(
+                manifest["paths"]["style.css"], r"^style\.[a-f0-9]{12}\.min\.css$"
+            )
+
+    def test_manifest_round_trip(self):
+        """Test the manifest is loaded back as it was saved."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            storage.hashed_files = {
+                "style.css": "style.abc123.min.css",
+                "js/app.js": "js/app.def456.js",
+            }
+            storage.save_manifest()
+            with open(os.path.join(self.static_root, storage.manifest_name)) as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest["paths"], storage.hashed_files)
+            self.assertEqual(manifest["hash"], storage.manifest_hash)
+            loaded = MinicompressStorage()
+            self.assertEqual(loaded.hashed_files, storage.hashed_files)
+            self.assertEqual(loaded.manifest_hash, storage.manifest_hash)
+
+    def test_save_manifest_matches_django(self):
+        """Test the manifest is written exactly as Django writes it."""
+        hashed_files = {"js/app.js": "js/app.def456.js", "a.css": "a.abc.min.css"}
+        with self.settings(STATIC_ROOT=self.static_root):
+            storage = MinicompressStorage()
+            storage.hashed_files = dict(hashed_files)
+            storage.save_manifest()
+            manifest_path = os.path.join(self.static_root, storage.manifest_name)
+            with open(manifest_path, "rb") as f:
+                contents = f.read()
+            django_storage = ManifestStaticFilesStorage()
+            django_storage.hashed_files = dict(hashed_files)
+            django_storage.save_manifest()
+            with open(manifest_path, "rb") as f:
+                self.assertEqual(f.read(), contents)
+
+    def test_load_manifest_invalid(self):
+        """Test loading an invalid manifest raises ValueError."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            with open(os.path.join(self.static_root, "staticfiles.json"), "w") as f:
+                f.write("{invalid")
+            with self.assertRaises(ValueError):
+                MinicompressStorage()
+
     def test_manifest_without_proper_structure_fails(self):
         """Test that manifest without 'paths' key would cause issues.
 
@@ -1,19 +1,26 @@
 """Tests for utility functions."""
 
+import hashlib
+import mmap
 import os
+import shutil
 import tempfile
+from unittest.mock import patch
 
 from django.core.files.storage import FileSystemStorage
 from django.test import TestCase
 
 from django_minify_compress_staticfiles.utils import (
     FileManager,
+    compile_exclude_patterns,
     create_hashed_filename,
     generate_file_hash,
     get_file_size,
     is_safe_path,
+    join_path,
     normalize_extension,
     should_process_file,
+    split_path,
     validate_file_size,
 )
 
@@ -51,6 +58,37 @@ class GenerateFileHashTests(TestCase):
         # Invalid type (non-bytes, non-path object) returns empty string
         self.assertEqual(generate_file_hash(object()), "")
 
+    def test_hash_matches_md5(self):
+        """Test hashes match Django's MD5 based ones, also across chunks."""
+        content = os.urandom(1024) * 2500
+        expected = hashlib.md5(content).hexdigest()[:12]
+        self.assertEqual(generate_file_hash(content), expected)
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(content)
+            temp_path = f.name
+        try:
+            self.assertEqual(generate_file_hash(temp_path), expected)
+        finally:
+            os.unlink(temp_path)
+
+    def test_hash_file_mmap(self):
+        """Test only files larger than a chunk are memory-mapped."""
+        for size, mapped in ((1024, False), (3 * 1024 * 1024, True)):
+            content = os.urandom(size)
+            with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+                f.write(content)
+                temp_path = f.name
+            try:
+                with patch(
+                    "django_minify_compress_staticfiles.utils.mmap.mmap",
+                    wraps=mmap.mmap,
+                ) as mock_mmap:
+                    result = generate_file_hash(temp_path)
+            finally:
+                os.unlink(temp_path)
+            self.assertEqual(result, hashlib.md5(content).hexdigest()[:12])
+            self.assertEqual(mock_mmap.called, mapped)
+
     def test_hash_large_file(self):
         """Test that large files are skipped during hashing."""
         with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
@@ -90,6 +128,18 @@ class CreateHashedFilenameTests(TestCase):
 class UtilityFunctionsTests(TestCase):
     """Tests for normalize_extension and get_file_size."""
 
+    def test_split_path(self):
+        """Test paths are split into directory, stem and extension."""
+        css_dir = os.path.join("css", "main")
+        self.assertEqual(
+            split_path(os.path.join(css_dir, "a.123.css")), (css_dir, "a.123", ".css")
+        )
+        self.assertEqual(split_path("a.css"), ("", "a", ".css"))
+        self.assertEqual(split_path(".htaccess"), ("", ".htaccess", ""))
+        self.assertEqual(join_path(css_dir, "a.css"), os.path.join(css_dir, "a.css"))
+        self.assertEqual(join_path("", "a.css"), "a.css")
+        self.assertEqual(join_path(".", "a.css"), "a.css")
+
     def test_normalize_extension(self):
         """Test extension normalization."""
         self.assertEqual(normalize_extension(".CSS"), "css")
@@ -136,6 +186,25 @@ class ShouldProcessFileTests(TestCase):
         self.assertFalse(should_process_file("app.min.css", ["css"], [".min.css"]))
         self.assertTrue(should_process_file("app.css", ["css"], [".min.css"]))
 
+    def test_exclude_patterns_glob(self):
+        """Test glob wildcards in exclude patterns."""
+        patterns = ["vendor-?.js", "*.[ch]ss", "*.min.*"]
+        self.assertFalse(should_process_file("vendor-1.js", ["js"], patterns))
+        self.assertTrue(should_process_file("vendor-10.js", ["js"], patterns))
+        self.assertFalse(should_process_file("theme.css", ["css"], patterns))
+        self.assertTrue(should_process_file("theme.css", ["css"], ["*.[h]ss"]))
+        self.assertFalse(should_process_file("lib/app.min.js", ["js"], patterns))
+        self.assertTrue(should_process_file("app.js", ["js"], patterns))
+
+    def test_compile_exclude_patterns(self):
+        """Test exclude patterns are compiled once into a single regex."""
+        self.assertIsNone(compile_exclude_patterns(()))
+        regex = compile_exclude_patterns(("*.gz", ".br"))
+        self.assertIs(compile_exclude_patterns(("*.gz", ".br")), regex)
+        self.assertTrue(regex.match("app.js.gz"))
+        self.assertTrue(regex.match("app.js.br"))
+        self.assertFalse(regex.match("app.js"))
+
 
 class FileManagerTests(TestCase):
     """Tests for FileManager class."""
@@ -156,6 +225,18 @@ class FileManagerTests(TestCase):
         self.assertTrue(self.manager.should_process("style.css"))
         self.assertFalse(self.manager.should_process("style.min.css"))
 
+    def test_exclude_regex(self):
+        """Test exclude patterns are compiled once per FileManager."""
+        regex = self.manager.exclude_regex
+        self.assertIs(self.manager.exclude_regex, regex)
+        self.assertTrue(regex.match("style.min.css"))
+        self.assertIsNone(regex.match("style.css"))
+        with patch(
+            "django_minify_compress_staticfiles.utils.compile_exclude_patterns"
+        ) as mock_compile:
+            self.manager.should_process("style.css")
+        mock_compile.assert_not_called()
+
     def test_is_compression_candidate(self):
         """Test compression candidate check."""
         with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
@@ -171,6 +252,38 @@ class FileManagerTests(TestCase):
             os.unlink(large_path)
             os.unlink(small_path)
 
+    def test_is_compression_candidate_incompressible(self):
+        """Test already compressed formats are rejected without a stat."""
+        with patch(
+            "django_minify_compress_staticfiles.utils.get_file_size"
+        ) as mock_size:
+            self.assertFalse(self.manager.is_compression_candidate("font.woff2"))
+            self.assertFalse(self.manager.is_compression_candidate("img/logo.PNG"))
+            self.assertFalse(self.manager.is_compression_candidate("app.js.gz"))
+        mock_size.assert_not_called()
+
+    def test_prewarm_sizes(self):
+        """Test sizes are cached per directory and used for candidacy."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        os.makedirs(os.path.join(temp_dir, "css"))
+        for name, size in (("a.css", 300), ("b.css", 10), ("c.css", 300)):
+            with open(os.path.join(temp_dir, "css", name), "wb") as f:
+                f.write(b"x" * size)
+        manager = FileManager(FileSystemStorage(location=temp_dir))
+        manager.prewarm_sizes(["css/a.css", "css/b.css", "missing/d.css"])
+        self.assertEqual(manager._size_cache, {"css/a.css": 300, "css/b.css": 10})
+        with patch(
+            "django_minify_compress_staticfiles.utils.get_file_size"
+        ) as mock_size:
+            self.assertTrue(manager.is_compression_candidate("css/a.css"))
+            self.assertFalse(manager.is_compression_candidate("css/b.css"))
+        mock_size.assert_not_called()
+        # Paths that weren't prewarmed are still checked on their own
+        self.assertTrue(manager.is_compression_candidate("css/c.css"))
+        manager.clear_sizes()
+        self.assertEqual(manager._size_cache, {})
+
 
 class IsSafePathTests(TestCase):
     """Tests for is_safe_path function."""